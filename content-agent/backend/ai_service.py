@@ -1,8 +1,15 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
 import requests
 
+from backend import http_client
+from backend.llm_cache import cache_key, get_llm_cache
 from config.settings import settings
 
 FALLBACK_MODELS = [settings.groq_model, "llama-3.1-8b-instant", "llama-3.3-70b-versatile"]
+GENERATION_TEMPERATURE = 0.7
 SUPPORTED_PLATFORMS = ["linkedin", "instagram", "twitter", "facebook", "blog_summary"]
 PLATFORM_PROMPTS = {
     "linkedin": "Write one professional LinkedIn post with strong hook, 3 key points, and CTA.",
@@ -13,7 +20,7 @@ PLATFORM_PROMPTS = {
 }
 
 
-def _generate(content: str, instruction: str) -> str:
+def _chat(user_content: str, deadline: float | None = None, json_mode: bool = False) -> str:
     if not settings.groq_api_key:
         raise RuntimeError("GROQ_API_KEY is required")
 
@@ -22,32 +29,87 @@ def _generate(content: str, instruction: str) -> str:
         "Content-Type": "application/json",
     }
 
+    cache = get_llm_cache()
+    key = ""
+    if cache is not None:
+        key = cache_key(
+            models=FALLBACK_MODELS,
+            content=user_content,
+            temperature=GENERATION_TEMPERATURE,
+            json_mode=json_mode,
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
     last_error = ""
     for model in FALLBACK_MODELS:
+        timeout = settings.groq_call_timeout_seconds
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                last_error = last_error or f"model={model} deadline exceeded"
+                break
         payload = {
             "model": model,
             "messages": [
                 {"role": "system", "content": "You are a senior social media content strategist."},
-                {
-                    "role": "user",
-                    "content": f"{instruction}\n\nSource content:\n{content}",
-                },
+                {"role": "user", "content": user_content},
             ],
-            "temperature": 0.7,
+            "temperature": GENERATION_TEMPERATURE,
         }
-        response = requests.post(
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        response = http_client.post(
             f"{settings.groq_api_base_url}/chat/completions",
             headers=headers,
             json=payload,
-            timeout=60,
+            timeout=timeout,
         )
         if response.status_code == 200:
-            return response.json()["choices"][0]["message"]["content"].strip()
+            text = response.json()["choices"][0]["message"]["content"].strip()
+            if cache is not None and text:
+                cache.set(key, text)
+            return text
         last_error = f"model={model} status={response.status_code} body={response.text[:300]}"
 
     raise RuntimeError(f"Groq generation failed: {last_error}")
 
 
+def _generate(content: str, instruction: str, deadline: float | None = None) -> str:
+    return _chat(f"{instruction}\n\nSource content:\n{content}", deadline=deadline)
+
+
+def _generate_combined(
+    content: str,
+    instructions: dict[str, str],
+    shared_lines: str,
+    deadline: float | None = None,
+) -> dict[str, str]:
+    """One JSON-mode request for every platform; returns only the sections that came back usable."""
+    sections = "\n".join(f'- "{platform}": {instruction}' for platform, instruction in instructions.items())
+    prompt = (
+        "Write one post per platform below. Respond with a single JSON object whose keys are exactly "
+        "the platform names and whose values are the finished post text as a string.\n"
+        f"{sections}\n{shared_lines}".strip()
+        + f"\n\nSource content:\n{content}"
+    )
+    try:
+        raw = _chat(prompt, deadline=deadline, json_mode=True)
+        data = json.loads(raw)
+    except (RuntimeError, ValueError, requests.RequestException):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    outputs: dict[str, str] = {}
+    for platform in instructions:
+        value = data.get(platform)
+        if isinstance(value, str) and value.strip():
+            outputs[platform] = value.strip()
+    return outputs
+
+
 def _language_instruction(language_pref: str) -> str:
     pref = (language_pref or "english_urdu").strip().lower()
     if pref == "english":
@@ -71,9 +133,40 @@ def generate_platform_posts(
     lang_line = _language_instruction(language_pref)
     context_line = f"Business context: {profile_context.strip()}" if profile_context.strip() else ""
 
+    shared_lines = f"{lang_line}\n{context_line}".strip()
+    deadline = time.monotonic() + settings.groq_run_deadline_seconds
+
     outputs: dict[str, str] = {}
-    for platform in selected:
-        base_prompt = PLATFORM_PROMPTS.get(platform, PLATFORM_PROMPTS["linkedin"])
-        instruction = f"{base_prompt}\n{lang_line}\n{context_line}".strip()
-        outputs[platform] = _generate(content, instruction)
-    return outputs
+    if settings.groq_generation_mode == "combined" and len(selected) > 1:
+        outputs = _generate_combined(
+            content,
+            {platform: PLATFORM_PROMPTS.get(platform, PLATFORM_PROMPTS["linkedin"]) for platform in selected},
+            shared_lines,
+            deadline,
+        )
+
+    # Whatever the combined call did not cover goes out as independent per-platform requests.
+    instructions = {
+        platform: f"{PLATFORM_PROMPTS.get(platform, PLATFORM_PROMPTS['linkedin'])}\n{shared_lines}".strip()
+        for platform in selected
+        if platform not in outputs
+    }
+    if not instructions:
+        return {platform: outputs[platform] for platform in selected}
+
+    workers = max(1, min(settings.groq_max_concurrency, len(instructions)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="groq")
+    try:
+        futures = {
+            platform: executor.submit(_generate, content, instruction, deadline)
+            for platform, instruction in instructions.items()
+        }
+        wait(futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for platform, future in futures.items():
+        if not future.done():
+            raise RuntimeError(f"Groq generation timed out for {platform}")
+        outputs[platform] = future.result()
+    return {platform: outputs[platform] for platform in selected}
@@ -3,6 +3,8 @@ from __future__ import annotations
 import hashlib
 from datetime import datetime, timedelta
 
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from backend.db_models import ClientPerformanceMetric, PostClientLink
@@ -52,35 +54,21 @@ def record_publish_metric(
     metric_dt = (posted_at or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
     values = _synthetic_values(post_id, platform)
 
-    row = (
-        db.query(ClientPerformanceMetric)
-        .filter(
-            ClientPerformanceMetric.user_id == user_id,
-            ClientPerformanceMetric.client_id == target_client_id,
-            ClientPerformanceMetric.platform == platform,
-            ClientPerformanceMetric.metric_date == metric_dt,
-        )
-        .first()
+    # One statement, so parallel publishers for the same client add to the day's row instead of racing to create it.
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = insert(ClientPerformanceMetric).values(
+        user_id=user_id,
+        client_id=target_client_id,
+        platform=platform,
+        metric_date=metric_dt,
+        **values,
     )
-    if not row:
-        row = ClientPerformanceMetric(
-            user_id=user_id,
-            client_id=target_client_id,
-            platform=platform,
-            metric_date=metric_dt,
-            likes=values["likes"],
-            shares=values["shares"],
-            comments=values["comments"],
-            clicks=values["clicks"],
-            follower_growth=values["follower_growth"],
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["user_id", "client_id", "platform", "metric_date"],
+            set_={column: getattr(ClientPerformanceMetric, column) + statement.excluded[column] for column in values},
         )
-        db.add(row)
-    else:
-        row.likes += values["likes"]
-        row.shares += values["shares"]
-        row.comments += values["comments"]
-        row.clicks += values["clicks"]
-        row.follower_growth += values["follower_growth"]
+    )
 
 
 def aggregate_metrics(
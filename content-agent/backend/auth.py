@@ -1,11 +1,14 @@
-import requests
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
 from jose import jwt
 from fastapi import Header, HTTPException
 
+from backend import http_client
 from config.settings import settings
 
-_cached_jwks: dict | None = None
-
 
 def _jwks_url() -> str:
     if settings.supabase_jwks_url:
@@ -15,15 +18,117 @@ def _jwks_url() -> str:
     raise RuntimeError("SUPABASE_URL or SUPABASE_JWKS_URL is required")
 
 
-def _get_jwks() -> dict:
-    global _cached_jwks
-    if _cached_jwks is not None:
-        return _cached_jwks
+class JWKSCache:
+    """Signing keys by ``kid``: refreshed in the background before the TTL runs out, refetched on an unknown kid."""
+
+    def __init__(self, ttl_seconds: int, min_refetch_seconds: int) -> None:
+        self.ttl_seconds = max(1, ttl_seconds)
+        self.min_refetch_seconds = max(0, min_refetch_seconds)
+        self._keys: dict[str, dict] | None = None
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+
+    def _fetch(self) -> None:
+        # Single flight: concurrent misses wait for the one fetch already running instead of stampeding Supabase.
+        with self._fetch_lock:
+            with self._lock:
+                if self._keys is not None and time.monotonic() - self._last_attempt < self.min_refetch_seconds:
+                    return
+                self._last_attempt = time.monotonic()
+            response = http_client.get(_jwks_url(), timeout=settings.auth_jwks_timeout_seconds)
+            response.raise_for_status()
+            keys = {key.get("kid"): key for key in response.json().get("keys", [])}
+            with self._lock:
+                self._keys = keys
+                self._fetched_at = time.monotonic()
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run() -> None:
+            try:
+                self._fetch()
+            except Exception:
+                # Keep serving the keys we have; the next request past the refresh point tries again.
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="jwks-refresh", daemon=True).start()
+
+    def warm(self) -> None:
+        self._refresh_in_background()
+
+    def get_key(self, kid: str | None) -> dict | None:
+        with self._lock:
+            keys = self._keys
+            age = time.monotonic() - self._fetched_at
+        if keys is None:
+            self._fetch()
+        elif age >= self.ttl_seconds * 0.8:
+            self._refresh_in_background()
+
+        with self._lock:
+            key = (self._keys or {}).get(kid)
+        if key is None:
+            # A kid we have not seen usually means Supabase rotated keys since our last fetch.
+            self._fetch()
+            with self._lock:
+                key = (self._keys or {}).get(kid)
+        return key
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys = None
+            self._fetched_at = 0.0
+            self._last_attempt = 0.0
+
+
+class VerifiedTokenCache:
+    """LRU of already-verified tokens (by SHA-256) -> user id, each entry valid until the token's ``exp``."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token_key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(token_key)
+            if entry is None:
+                return None
+            user_id, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[token_key]
+                return None
+            self._entries.move_to_end(token_key)
+            return user_id
+
+    def put(self, token_key: str, user_id: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[token_key] = (user_id, expires_at)
+            self._entries.move_to_end(token_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
 
-    response = requests.get(_jwks_url(), timeout=20)
-    response.raise_for_status()
-    _cached_jwks = response.json()
-    return _cached_jwks
+jwks_cache = JWKSCache(settings.auth_jwks_ttl_seconds, settings.auth_jwks_min_refetch_seconds)
+verified_tokens = VerifiedTokenCache(settings.auth_token_cache_max_entries)
 
 
 def _extract_bearer_token(authorization: str | None) -> str:
@@ -34,11 +139,14 @@ def _extract_bearer_token(authorization: str | None) -> str:
 
 def get_current_user_id(authorization: str | None = Header(default=None)) -> str:
     token = _extract_bearer_token(authorization)
+    token_key = VerifiedTokenCache.key(token)
+    cached_user_id = verified_tokens.get(token_key)
+    if cached_user_id:
+        return cached_user_id
 
     unverified = jwt.get_unverified_header(token)
     kid = unverified.get("kid")
-    keys = _get_jwks().get("keys", [])
-    key = next((k for k in keys if k.get("kid") == kid), None)
+    key = jwks_cache.get_key(kid)
     if not key:
         raise HTTPException(status_code=401, detail="Invalid token key")
 
@@ -56,4 +164,7 @@ def get_current_user_id(authorization: str | None = Header(default=None)) -> str
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token payload")
 
-    return user_id
\ No newline at end of file
+    # Tokens without an expiry are verified every time rather than trusted indefinitely.
+    if isinstance(payload.get("exp"), (int, float)):
+        verified_tokens.put(token_key, user_id, float(payload["exp"]))
+    return user_id
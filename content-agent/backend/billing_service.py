@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.db_models import ClientPayment, ClientProfile
+from backend.response_cache import CLIENTS, invalidate_user
+
+
+def _clients_to_pause(payments, now: datetime) -> set[int]:
+    paused: set[int] = set()
+    for client_id, subscription_status, due_date in payments:
+        status = (subscription_status or "").strip().lower()
+        if status in {"unpaid", "paused", "cancelled"}:
+            paused.add(client_id)
+        elif status == "past_due" and due_date and due_date <= now:
+            paused.add(client_id)
+    return paused
+
+
+def _apply(db: Session, user_id: str | None) -> int:
+    now = datetime.utcnow()
+    client_query = db.query(ClientProfile.id, ClientProfile.user_id, ClientProfile.service_paused)
+    payment_query = db.query(ClientPayment.client_id, ClientPayment.subscription_status, ClientPayment.due_date).filter(
+        ClientPayment.auto_pause_if_unpaid.is_(True)
+    )
+    if user_id is not None:
+        client_query = client_query.filter(ClientProfile.user_id == user_id)
+        payment_query = payment_query.filter(ClientPayment.user_id == user_id)
+
+    clients = client_query.all()
+    if not clients:
+        return 0
+    should_pause = _clients_to_pause(payment_query.all(), now)
+
+    to_pause = [client_id for client_id, _, paused in clients if client_id in should_pause and not paused]
+    to_resume = [client_id for client_id, _, paused in clients if client_id not in should_pause and paused]
+    if to_pause:
+        db.execute(update(ClientProfile).where(ClientProfile.id.in_(to_pause)).values(service_paused=True))
+    if to_resume:
+        db.execute(update(ClientProfile).where(ClientProfile.id.in_(to_resume)).values(service_paused=False))
+    if to_pause or to_resume:
+        db.commit()
+        changed = set(to_pause) | set(to_resume)
+        for owner in {owner for client_id, owner, _ in clients if client_id in changed}:
+            invalidate_user(owner, CLIENTS)
+    return len(to_pause) + len(to_resume)
+
+
+def apply_payment_auto_pause(db: Session, user_id: str) -> int:
+    """Pause or resume one user's clients from their payment rows; returns how many clients changed."""
+    return _apply(db, user_id)
+
+
+def sweep_payment_auto_pause(session_factory) -> int:
+    """Scheduler entry point: re-evaluate every client so past-due deadlines take effect without a page load."""
+    db = session_factory()
+    try:
+        return _apply(db, None)
+    finally:
+        db.close()
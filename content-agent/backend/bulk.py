@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator, TypeVar
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+ModelT = TypeVar("ModelT")
+
+
+def insert_returning(db: Session, model: type[ModelT], rows: list[dict]) -> list[ModelT]:
+    """Batched multi-row INSERT ... RETURNING; instances come back fully loaded, ordered by id."""
+    # sort_by_parameter_order would make SQLite fall back to one INSERT per row.
+    if not rows:
+        return []
+    created = db.scalars(insert(model).returning(model), rows).all()
+    return sorted(created, key=lambda row: row.id)
+
+
+def insert_rows(db: Session, model: type, rows: list[dict]) -> None:
+    if rows:
+        db.execute(insert(model), rows)
+
+
+@contextmanager
+def keep_loaded_on_commit(db: Session) -> Iterator[Session]:
+    """Stop commits from expiring rows we just loaded via RETURNING, so reading them later costs no SELECTs."""
+    previous = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        yield db
+    finally:
+        db.expire_on_commit = previous
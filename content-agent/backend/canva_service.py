@@ -6,11 +6,13 @@ import secrets
 from datetime import datetime, timedelta, timezone
 from urllib.parse import urlencode
 
-import requests
 from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
 from sqlalchemy.orm import Session
 
+from backend import http_client
+from backend.credentials import invalidate_credentials
 from backend.db_models import OAuthState, SocialAccount
+from backend.response_cache import SOCIAL, invalidate_user
 from backend.security import encrypt_text
 from config.settings import settings
 
@@ -73,7 +75,7 @@ def handle_canva_callback(db: Session, code: str, state: str) -> str:
     if not verifier:
         raise RuntimeError("OAuth verifier missing")
 
-    token_resp = requests.post(
+    token_resp = http_client.post(
         CANVA_TOKEN_URL,
         auth=(settings.canva_client_id, settings.canva_client_secret),
         data={
@@ -121,4 +123,6 @@ def handle_canva_callback(db: Session, code: str, state: str) -> str:
 
     db.delete(state_row)
     db.commit()
+    invalidate_user(user_id, SOCIAL)
+    invalidate_credentials(user_id, "canva")
     return user_id
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Iterable
+
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.db_models import SocialAccount
+from backend.security import decrypt_many, decrypt_text, needs_rotation, rotate_text
+
+
+def _rotate_stale_tokens(db: Session, rows: list[SocialAccount]) -> None:
+    # Re-encrypt tokens still under a retired key as they are read, so that key can later leave ENCRYPTION_KEY.
+    updates: list[tuple[SocialAccount, dict]] = []
+    for row in rows:
+        values = {}
+        for column in ("access_token_enc", "refresh_token_enc"):
+            value = getattr(row, column)
+            if needs_rotation(value):
+                try:
+                    values[column] = rotate_text(value)
+                except Exception:
+                    continue
+        if values:
+            updates.append((row, values))
+    if not updates:
+        return
+    # A separate session: readers call this mid-publish, and the caller's transaction must not be committed or
+    # rolled back by a rotation. The caller's rows keep the old ciphertext, which still decrypts.
+    with Session(bind=db.get_bind()) as rotation_db:
+        try:
+            for row, values in updates:
+                rotation_db.query(SocialAccount).filter(
+                    SocialAccount.id == row.id,
+                    SocialAccount.access_token_enc == row.access_token_enc,
+                ).update(values, synchronize_session=False)
+            rotation_db.commit()
+        except Exception:
+            # Best effort: nothing is lost, and the next read tries again.
+            rotation_db.rollback()
+
+
+@dataclass(frozen=True)
+class Credential:
+    account_id: str
+    access_token: str
+
+
+class CredentialCache:
+    """Decrypted SocialAccount tokens by (user_id, platform), scoped to one scheduler batch or request.
+
+    A missing account is cached as None, so publishers can still raise their own "not connected" errors.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[tuple[str, str], Credential | None] = {}
+        self._lock = threading.Lock()
+        with _live_lock:
+            _live_caches.add(self)
+
+    def prefetch(self, db: Session, keys: Iterable[tuple[str, str]]) -> None:
+        """Load every requested account in one query and decrypt their tokens in one batch."""
+        with self._lock:
+            wanted = {key for key in keys if key not in self._entries}
+        if not wanted:
+            return
+        rows = (
+            db.query(SocialAccount)
+            .filter(
+                or_(
+                    *(
+                        (SocialAccount.user_id == user_id) & (SocialAccount.platform == platform)
+                        for user_id, platform in wanted
+                    )
+                )
+            )
+            .all()
+        )
+        try:
+            plaintext = decrypt_many(row.access_token_enc for row in rows)
+        except Exception:
+            plaintext = {}
+            for row in rows:
+                try:
+                    plaintext[row.access_token_enc] = decrypt_text(row.access_token_enc)
+                except Exception:
+                    # Left unloaded so get() raises the decrypt error for that account's posts only.
+                    continue
+
+        loaded: dict[tuple[str, str], Credential | None] = {key: None for key in wanted}
+        for row in rows:
+            key = (row.user_id, row.platform)
+            if row.access_token_enc in plaintext:
+                loaded[key] = Credential(account_id=row.account_id, access_token=plaintext[row.access_token_enc])
+            else:
+                loaded.pop(key, None)
+        _rotate_stale_tokens(db, [row for row in rows if row.access_token_enc in plaintext])
+        with self._lock:
+            for key, credential in loaded.items():
+                self._entries.setdefault(key, credential)
+
+    def get(self, db: Session, user_id: str, platform: str) -> Credential | None:
+        key = (user_id, platform)
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+        row = (
+            db.query(SocialAccount)
+            .filter(SocialAccount.user_id == user_id, SocialAccount.platform == platform)
+            .first()
+        )
+        credential = Credential(account_id=row.account_id, access_token=decrypt_text(row.access_token_enc)) if row else None
+        if row:
+            _rotate_stale_tokens(db, [row])
+        with self._lock:
+            return self._entries.setdefault(key, credential)
+
+    async def aget(self, db: AsyncSession, user_id: str, platform: str) -> Credential | None:
+        return await db.run_sync(self.get, user_id, platform)
+
+    def invalidate(self, user_id: str, platform: str | None = None) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id and platform in (None, key[1])]:
+                del self._entries[key]
+
+
+_live_caches: weakref.WeakSet[CredentialCache] = weakref.WeakSet()
+_live_lock = threading.Lock()
+
+
+def invalidate_credentials(user_id: str, platform: str | None = None) -> None:
+    """Drop ``user_id``'s cached tokens from every live cache after a reconnect or token refresh."""
+    with _live_lock:
+        caches = list(_live_caches)
+    for cache in caches:
+        cache.invalidate(user_id, platform)
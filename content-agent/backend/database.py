@@ -1,19 +1,261 @@
-from sqlalchemy import create_engine
+import threading
+import time
+import uuid
+from typing import AsyncIterator
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
 from config.settings import settings
 from backend.db_models import Base
+from backend.migrations import run_migrations
 
 
 if not settings.database_url:
     raise RuntimeError("DATABASE_URL is required")
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+
+class PoolMetrics:
+    """Checkout counts and queue waits, so the pool can be sized against scheduler + API peaks."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: dict[str, float] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._data = {
+                "checkouts": 0,
+                "checkout_timeouts": 0,
+                "connects": 0,
+                "disconnects_detected": 0,
+                "pings": 0,
+                "in_use": 0,
+                "peak_in_use": 0,
+                "wait_total_ms": 0.0,
+                "wait_max_ms": 0.0,
+            }
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._data[name] += amount
+
+    def record_wait(self, seconds: float) -> None:
+        waited_ms = seconds * 1000
+        with self._lock:
+            self._data["wait_total_ms"] += waited_ms
+            self._data["wait_max_ms"] = max(self._data["wait_max_ms"], waited_ms)
+
+    def checked_out(self) -> None:
+        with self._lock:
+            self._data["checkouts"] += 1
+            self._data["in_use"] += 1
+            self._data["peak_in_use"] = max(self._data["peak_in_use"], self._data["in_use"])
+
+    def checked_in(self) -> None:
+        with self._lock:
+            self._data["in_use"] = max(0, self._data["in_use"] - 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data = dict(self._data)
+        data["wait_avg_ms"] = round(data["wait_total_ms"] / data["checkouts"], 3) if data["checkouts"] else 0.0
+        data["wait_total_ms"] = round(data["wait_total_ms"], 3)
+        data["wait_max_ms"] = round(data["wait_max_ms"], 3)
+        return data
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+class _InstrumentedPoolMixin:
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.count("checkout_timeouts")
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool that times how long each checkout waits for a free connection."""
+
+    metrics = pool_metrics
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+
+def _engine_options(url: URL, poolclass: type = InstrumentedQueuePool) -> dict:
+    options: dict = {}
+    backend = url.get_backend_name()
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+
+    if settings.db_pgbouncer_mode:
+        # PgBouncer/Supavisor already pools server connections; a second client-side pool only pins them.
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=poolclass,
+            pool_size=max(1, settings.db_pool_size),
+            max_overflow=max(0, settings.db_max_overflow),
+            pool_timeout=max(1.0, settings.db_pool_timeout_seconds),
+            pool_recycle=settings.db_pool_recycle_seconds if settings.db_pool_recycle_seconds > 0 else -1,
+            pool_pre_ping=settings.db_pool_pre_ping == "always",
+        )
+        # Transaction-mode poolers reject startup options, so this is only sent on direct connections.
+        if backend == "postgresql" and settings.db_statement_timeout_ms > 0:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return options
+
+
+def _install_listeners(target: Engine, metrics: PoolMetrics = pool_metrics) -> None:
+    @event.listens_for(target, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        metrics.count("connects")
+
+    @event.listens_for(target, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        checked_in_at = connection_record.info.get("checked_in_at")
+        idle_ping = settings.db_pool_pre_ping == "idle" and not settings.db_pgbouncer_mode
+        if idle_ping and checked_in_at is not None:
+            if time.monotonic() - checked_in_at >= settings.db_pool_pre_ping_idle_seconds:
+                # Only connections that sat idle long enough to be dropped pay for a liveness round trip.
+                metrics.count("pings")
+                cursor = dbapi_connection.cursor()
+                try:
+                    cursor.execute("select 1")
+                except Exception as error:
+                    metrics.count("disconnects_detected")
+                    raise exc.DisconnectionError() from error
+                finally:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass
+        metrics.checked_out()
+
+    @event.listens_for(target, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        connection_record.info["checked_in_at"] = time.monotonic()
+        metrics.checked_in()
+
+    if settings.db_pgbouncer_mode and target.dialect.name == "postgresql" and settings.db_statement_timeout_ms > 0:
+
+        @event.listens_for(target, "begin")
+        def _set_statement_timeout(conn) -> None:
+            # SET LOCAL is scoped to the transaction, so it never leaks to the next PgBouncer client.
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(f"set local statement_timeout = {int(settings.db_statement_timeout_ms)}")
+            finally:
+                cursor.close()
+
+
+def build_engine(database_url: str) -> Engine:
+    target = create_engine(database_url, **_engine_options(make_url(database_url)))
+    _install_listeners(target)
+    return target
+
+
+engine = build_engine(settings.database_url)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 
+_async_engine: AsyncEngine | None = None
+_async_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+_async_lock = threading.Lock()
+
+
+def _async_url(url: URL) -> tuple[URL, dict]:
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite"), {}
+    if backend != "postgresql":
+        raise RuntimeError(f"No async driver configured for {backend} databases")
+
+    connect_args: dict = {}
+    query = dict(url.query)
+    # asyncpg spells libpq's sslmode as ssl.
+    if "sslmode" in query:
+        connect_args["ssl"] = query.pop("sslmode")
+    if settings.db_pgbouncer_mode:
+        # Transaction pooling hands each statement to any server connection, so named prepared statements must not be reused.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4().hex}__"
+    elif settings.db_statement_timeout_ms > 0:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+    return url.set(drivername="postgresql+asyncpg", query=query), connect_args
+
+
+def get_async_engine() -> AsyncEngine:
+    """Async engine over the same database (asyncpg / aiosqlite), created on first use."""
+    global _async_engine, _async_sessionmaker
+    with _async_lock:
+        if _async_engine is None:
+            url, connect_args = _async_url(make_url(settings.database_url))
+            options = _engine_options(url, poolclass=InstrumentedAsyncQueuePool)
+            options.pop("connect_args", None)
+            if connect_args:
+                options["connect_args"] = connect_args
+            _async_engine = create_async_engine(url, **options)
+            _install_listeners(_async_engine.sync_engine, async_pool_metrics)
+            # Rows stay readable after commit; an expired attribute would need a lazy load, which async sessions forbid.
+            _async_sessionmaker = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+        return _async_engine
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    async with _async_sessionmaker() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
+
+
 def init_db() -> None:
     Base.metadata.create_all(bind=engine)
+    # create_all never alters existing tables; the migrations bring older databases up to the models.
+    run_migrations(engine)
+
+
+def pool_stats() -> dict:
+    data = pool_metrics.snapshot()
+    pool = engine.pool
+    data["pool_class"] = type(pool).__name__
+    if isinstance(pool, QueuePool):
+        data.update(
+            pool_size=pool.size(),
+            max_overflow=settings.db_max_overflow,
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
+        )
+    if _async_engine is not None:
+        data["async"] = async_pool_metrics.snapshot()
+        async_pool = _async_engine.pool
+        data["async"]["pool_class"] = type(async_pool).__name__
+        if isinstance(async_pool, QueuePool):
+            data["async"].update(checked_out=async_pool.checkedout(), idle=async_pool.checkedin())
+    return data
 
 
 def get_db() -> Session:
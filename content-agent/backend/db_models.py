@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, String, Text, UniqueConstraint, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -43,6 +43,20 @@ class SocialAccount(Base):
 
 class GeneratedPost(Base):
     __tablename__ = "generated_posts"
+    __table_args__ = (
+        # Keyset pagination of /api/drafts, optionally narrowed by status or platform.
+        Index("idx_generated_posts_user_created", "user_id", "created_at", "id"),
+        Index("idx_generated_posts_user_status_created", "user_id", "status", "created_at", "id"),
+        Index("idx_generated_posts_user_platform_created", "user_id", "platform", "created_at", "id"),
+        # Scheduler due-post scan; only scheduled rows are indexed, so it stays small as history grows.
+        Index(
+            "idx_generated_posts_scheduled_due",
+            "scheduled_at",
+            "id",
+            postgresql_where=text("status = 'scheduled'"),
+            sqlite_where=text("status = 'scheduled'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[str] = mapped_column(String(64), index=True)
@@ -55,6 +69,8 @@ class GeneratedPost(Base):
     posted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     external_post_id: Mapped[str] = mapped_column(String(256), default="")
     last_error: Mapped[str] = mapped_column(Text, default="")
+    lease_owner: Mapped[str] = mapped_column(String(128), default="")
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -71,6 +87,7 @@ class OAuthState(Base):
 
 class MediaAsset(Base):
     __tablename__ = "media_assets"
+    __table_args__ = (Index("idx_media_assets_user_post", "user_id", "post_id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[str] = mapped_column(String(64), index=True)
@@ -141,6 +158,7 @@ class ContentPlan(Base):
 
 class ApprovalRequest(Base):
     __tablename__ = "approval_requests"
+    __table_args__ = (Index("idx_approval_requests_user_post", "user_id", "post_id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[str] = mapped_column(String(64), index=True)
@@ -153,6 +171,11 @@ class ApprovalRequest(Base):
 
 class PublishJob(Base):
     __tablename__ = "publish_jobs"
+    __table_args__ = (
+        Index("idx_publish_jobs_next_attempt", "next_attempt_at"),
+        Index("idx_publish_jobs_user_post", "user_id", "post_id"),
+        Index("idx_publish_jobs_post_next_attempt", "post_id", "next_attempt_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[str] = mapped_column(String(64), index=True)
@@ -162,6 +185,8 @@ class PublishJob(Base):
     scheduled_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     attempted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    attempt_count: Mapped[int] = mapped_column(default=0)
+    next_attempt_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     error_message: Mapped[str] = mapped_column(Text, default="")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -208,6 +233,11 @@ class ClientPayment(Base):
 
 class ClientPerformanceMetric(Base):
     __tablename__ = "client_performance_metrics"
+    __table_args__ = (
+        Index("idx_client_perf_user_client_date", "user_id", "client_id", "metric_date"),
+        Index("idx_client_perf_user_date", "user_id", "metric_date"),
+        Index("uq_client_perf_daily", "user_id", "client_id", "platform", "metric_date", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[str] = mapped_column(String(64), index=True)
@@ -224,7 +254,10 @@ class ClientPerformanceMetric(Base):
 
 class PostClientLink(Base):
     __tablename__ = "post_client_links"
-    __table_args__ = (UniqueConstraint("post_id", name="uq_post_client_link_post"),)
+    __table_args__ = (
+        UniqueConstraint("post_id", name="uq_post_client_link_post"),
+        Index("idx_post_client_links_client_post", "client_id", "post_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[str] = mapped_column(String(64), index=True)
@@ -1,18 +1,23 @@
 from __future__ import annotations
 
-import requests
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from backend import http_client
+from backend.credentials import Credential, CredentialCache, invalidate_credentials
 from backend.db_models import MediaAsset, SocialAccount
-from backend.media_service import download_media_bytes
-from backend.security import decrypt_text, encrypt_text
+from backend.http_client import RequestFlow
+from backend.media_service import download_media_flow
+from backend.publish_queue import PermanentPublishError, raise_for_provider_status
+from backend.response_cache import CLIENTS, SOCIAL, invalidate_user
+from backend.security import encrypt_text
 from config.settings import settings
 
 GRAPH_BASE = "https://graph.facebook.com/v25.0"
 
 
 def _get_page_profile(page_id: str, page_access_token: str) -> dict:
-    resp = requests.get(
+    resp = http_client.get(
         f"{GRAPH_BASE}/{page_id}",
         params={"fields": "id,name", "access_token": page_access_token},
         timeout=30,
@@ -53,58 +58,73 @@ def connect_facebook_from_settings(db: Session, user_id: str) -> SocialAccount:
         db.add(row)
     db.commit()
     db.refresh(row)
+    invalidate_user(user_id, SOCIAL, CLIENTS)
+    invalidate_credentials(user_id, "facebook")
     return row
 
 
-def _publish_text_post(page_id: str, token: str, content: str) -> dict:
-    resp = requests.post(
-        f"{GRAPH_BASE}/{page_id}/feed",
-        data={"message": content, "access_token": token},
-        timeout=30,
-    )
-    if resp.status_code >= 400:
-        raise RuntimeError(f"Facebook publish failed: {resp.status_code} {resp.text[:300]}")
+def _publish_text_post(page_id: str, token: str, content: str) -> RequestFlow[dict]:
+    resp = yield {
+        "method": "POST",
+        "url": f"{GRAPH_BASE}/{page_id}/feed",
+        "data": {"message": content, "access_token": token},
+        "timeout": 30,
+    }
+    raise_for_provider_status(resp, "Facebook publish failed")
     return resp.json()
 
 
-def _publish_photo_post(page_id: str, token: str, content: str, media_item: MediaAsset) -> dict:
+def _publish_photo_post(page_id: str, token: str, content: str, media_item: MediaAsset) -> RequestFlow[dict]:
     if not media_item.mime_type.startswith("image/"):
-        raise RuntimeError("Facebook publish currently supports image media only")
-    blob = download_media_bytes(media_item.storage_path)
+        raise PermanentPublishError("Facebook publish currently supports image media only")
+    blob = yield from download_media_flow(media_item.storage_path)
     files = {"source": (media_item.file_name, blob, media_item.mime_type)}
     data = {"caption": content, "access_token": token}
-    resp = requests.post(
-        f"{GRAPH_BASE}/{page_id}/photos",
-        data=data,
-        files=files,
-        timeout=60,
-    )
-    if resp.status_code >= 400:
-        raise RuntimeError(f"Facebook media publish failed: {resp.status_code} {resp.text[:300]}")
+    resp = yield {
+        "method": "POST",
+        "url": f"{GRAPH_BASE}/{page_id}/photos",
+        "data": data,
+        "files": files,
+        "timeout": 60,
+    }
+    raise_for_provider_status(resp, "Facebook media publish failed")
     return resp.json()
 
 
-def publish_to_facebook(
-    db: Session,
-    user_id: str,
-    content: str,
-    media_items: list[MediaAsset] | None = None,
-) -> dict:
-    account = (
-        db.query(SocialAccount)
-        .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "facebook")
-        .first()
-    )
-    if not account:
-        raise RuntimeError("Facebook account is not connected")
+def _publish_flow(credential: Credential | None, content: str, media_items: list[MediaAsset] | None) -> RequestFlow[dict]:
+    if not credential:
+        raise PermanentPublishError("Facebook account is not connected")
 
-    token = decrypt_text(account.access_token_enc)
-    page_id = account.account_id
+    token = credential.access_token
+    page_id = credential.account_id
     items = media_items or []
     image_item = next((x for x in items if x.mime_type.startswith("image/")), None)
 
-    payload = (
+    payload = yield from (
         _publish_photo_post(page_id, token, content, image_item) if image_item else _publish_text_post(page_id, token, content)
     )
     external_post_id = str(payload.get("post_id") or payload.get("id") or "").strip()
     return {"external_post_id": external_post_id}
+
+
+def publish_to_facebook(
+    db: Session,
+    user_id: str,
+    content: str,
+    media_items: list[MediaAsset] | None = None,
+    credentials: CredentialCache | None = None,
+) -> dict:
+    credential = (credentials or CredentialCache()).get(db, user_id, "facebook")
+    return http_client.run_flow(_publish_flow(credential, content, media_items))
+
+
+async def publish_to_facebook_async(
+    db: AsyncSession,
+    user_id: str,
+    content: str,
+    media_items: list[MediaAsset] | None = None,
+    credentials: CredentialCache | None = None,
+) -> dict:
+    credential = await (credentials or CredentialCache()).aget(db, user_id, "facebook")
+    await db.commit()
+    return await http_client.arun_flow(_publish_flow(credential, content, media_items))
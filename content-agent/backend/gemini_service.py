@@ -3,8 +3,7 @@ from __future__ import annotations
 import base64
 from typing import Any
 
-import requests
-
+from backend import http_client
 from config.settings import settings
 
 
@@ -48,7 +47,7 @@ def generate_image(prompt: str, width: int, height: int, *, strict: bool = False
         "contents": [{"parts": [{"text": safe_prompt[:4000]}]}],
         "generationConfig": {"responseModalities": ["TEXT", "IMAGE"]},
     }
-    response = requests.post(
+    response = http_client.post(
         _generate_content_url(),
         json=payload,
         timeout=90,
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Generator, TypeVar
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import settings
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+_async_client: httpx.AsyncClient | None = None
+
+T = TypeVar("T")
+# A provider call written once as a generator: it yields request kwargs and is sent back each response,
+# so the same logic runs on the pooled requests session (scheduler threads) or the async client (routes).
+RequestFlow = Generator[dict[str, Any], Any, T]
+
+
+class _CappedRetry(Retry):
+    """Honours Retry-After, but never sleeps longer than HTTP_RETRY_AFTER_MAX_SECONDS (urllib3 has no cap)."""
+
+    def get_retry_after(self, response) -> float | None:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, max(0.0, settings.http_retry_after_max_seconds))
+
+
+def _build_session() -> requests.Session:
+    # Only idempotent reads are retried; a retried POST could publish the same post twice.
+    retry = _CappedRetry(
+        total=max(0, settings.http_retry_total),
+        connect=max(0, settings.http_retry_total),
+        read=max(0, settings.http_retry_total),
+        status=max(0, settings.http_retry_total),
+        backoff_factor=settings.http_retry_backoff_seconds,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=max(1, settings.http_pool_connections),
+        pool_maxsize=max(1, settings.http_pool_maxsize),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Process-wide keep-alive session with one connection pool per host."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", (settings.http_connect_timeout_seconds, settings.http_read_timeout_seconds))
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def put(url: str, **kwargs) -> requests.Response:
+    return request("PUT", url, **kwargs)
+
+
+def close() -> None:
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def run_flow(flow: RequestFlow[T]) -> T:
+    response: Any = None
+    error: Exception | None = None
+    while True:
+        try:
+            spec = flow.throw(error) if error is not None else flow.send(response)
+        except StopIteration as done:
+            return done.value
+        try:
+            response, error = request(**spec), None
+        except Exception as exc:
+            response, error = None, exc
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Event-loop-wide async client; one instance serves every in-flight provider call without threads."""
+    global _async_client
+    if _async_client is None:
+        # Transport retries only cover failed connects, so they are safe for POSTs as well.
+        _async_client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                retries=max(0, settings.http_retry_total),
+                limits=httpx.Limits(
+                    max_connections=max(1, settings.http_async_max_connections),
+                    max_keepalive_connections=max(1, settings.http_pool_maxsize),
+                ),
+            ),
+            timeout=httpx.Timeout(settings.http_read_timeout_seconds, connect=settings.http_connect_timeout_seconds),
+        )
+    return _async_client
+
+
+def _httpx_timeout(timeout: Any) -> httpx.Timeout:
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout, connect=min(float(timeout), settings.http_connect_timeout_seconds))
+
+
+async def arequest(method: str, url: str, **kwargs) -> httpx.Response:
+    if isinstance(kwargs.get("data"), (bytes, bytearray)):
+        kwargs["content"] = kwargs.pop("data")
+    if "timeout" in kwargs:
+        kwargs["timeout"] = _httpx_timeout(kwargs["timeout"])
+    return await get_async_client().request(method, url, **kwargs)
+
+
+async def arun_flow(flow: RequestFlow[T]) -> T:
+    response: Any = None
+    error: Exception | None = None
+    while True:
+        try:
+            spec = flow.throw(error) if error is not None else flow.send(response)
+        except StopIteration as done:
+            return done.value
+        try:
+            response, error = await arequest(**spec), None
+        except Exception as exc:
+            response, error = None, exc
+
+
+async def aclose() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
@@ -4,13 +4,14 @@ import html
 import hashlib
 import random
 import re
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from urllib.parse import quote
 
-import requests
 from sqlalchemy.orm import Session
 
+from backend import http_client
 from backend.db_models import ContentPlan, GeneratedPost, MediaAsset
 from backend.gemini_service import generate_image as generate_image_with_gemini
 from config.settings import settings
@@ -150,10 +151,10 @@ def _supabase_headers(content_type: str | None = None) -> dict[str, str]:
 def _ensure_bucket() -> None:
     bucket = settings.supabase_storage_bucket
     url = f"{settings.supabase_url}/storage/v1/bucket/{bucket}"
-    r = requests.get(url, headers=_supabase_headers(), timeout=30)
+    r = http_client.get(url, headers=_supabase_headers(), timeout=30)
     if r.status_code == 200:
         return
-    create = requests.post(
+    create = http_client.post(
         f"{settings.supabase_url}/storage/v1/bucket",
         headers=_supabase_headers("application/json"),
         json={"id": bucket, "name": bucket, "public": False},
@@ -165,7 +166,7 @@ def _ensure_bucket() -> None:
 
 def _generate_signed_url(storage_path: str, expires_in: int = PLAN_IMAGE_EXPIRES_SECONDS) -> str:
     bucket = settings.supabase_storage_bucket
-    sign = requests.post(
+    sign = http_client.post(
         f"{settings.supabase_url}/storage/v1/object/sign/{bucket}/{storage_path}",
         headers=_supabase_headers("application/json"),
         json={"expiresIn": expires_in},
@@ -188,7 +189,7 @@ def _download_pollinations(prompt: str, width: int, height: int) -> tuple[bytes,
     headers = {"User-Agent": "ContentRepurposingAgent/1.0"}
     for url in urls:
         try:
-            response = requests.get(url, headers=headers, timeout=45)
+            response = http_client.get(url, headers=headers, timeout=45)
         except Exception:
             continue
         ctype = (response.headers.get("content-type") or "").split(";")[0].strip().lower()
@@ -637,35 +638,44 @@ def list_canva_templates() -> list[dict[str, str]]:
     return [dict(item) for item in CANVA_TEMPLATE_LIBRARY]
 
 
-def generate_plan_image(
-    db: Session,
+@dataclass
+class RenderedPlanImage:
+    plan_id: int
+    file_name: str
+    storage_path: str
+    mime_type: str
+    file_size: int
+    image_url: str
+
+
+def render_plan_image(
     user_id: str,
     plan_id: int,
+    platform: str,
+    theme: str,
+    post_angle: str,
+    image_prompt: str,
     business_name: str = "",
     source_text: str = "",
-    attach_post_id: int | None = None,
     strict_ai: bool = False,
-) -> ContentPlan:
-    plan = db.query(ContentPlan).filter(ContentPlan.id == plan_id, ContentPlan.user_id == user_id).first()
-    if not plan:
-        raise RuntimeError("Plan not found")
-
-    prompt = (plan.image_prompt or f"Social media creative for {plan.platform} {plan.theme}").strip()
-    width, height = _pick_dimensions(plan.platform)
-    seed = f"{plan.id}:{plan.platform}:{plan.theme}:{plan.post_angle}"
+) -> RenderedPlanImage:
+    """Generate, upload and sign a plan visual without touching the database (safe off the request thread)."""
+    prompt = (image_prompt or f"Social media creative for {platform} {theme}").strip()
+    width, height = _pick_dimensions(platform)
+    seed = f"{plan_id}:{platform}:{theme}:{post_angle}"
     style = _pick_style(seed)
     layout = _pick_layout(seed)
     template_family = _pick_template_family(seed)
     visual_source = "\n".join(
         x.strip()
-        for x in [source_text, plan.theme, plan.post_angle, prompt]
+        for x in [source_text, theme, post_angle, prompt]
         if (x or "").strip()
     )
     image_result = generate_image_with_gemini(
         _build_gemini_visual_prompt(
-            platform=plan.platform,
-            theme=plan.theme,
-            angle=plan.post_angle,
+            platform=platform,
+            theme=theme,
+            angle=post_angle,
             image_prompt=prompt,
             business_name=business_name,
             template_family=template_family,
@@ -687,9 +697,9 @@ def generate_plan_image(
         else:
             try:
                 image_bytes = _build_infographic_svg(
-                    plan.platform,
-                    plan.theme,
-                    plan.post_angle,
+                    platform,
+                    theme,
+                    post_angle,
                     visual_source,
                     business_name,
                     width,
@@ -700,9 +710,9 @@ def generate_plan_image(
                 mime_type = "image/svg+xml"
             except Exception:
                 image_bytes = _fallback_post_svg(
-                    plan.platform,
-                    plan.theme,
-                    plan.post_angle,
+                    platform,
+                    theme,
+                    post_angle,
                     business_name,
                     width,
                     height,
@@ -713,9 +723,9 @@ def generate_plan_image(
 
     if mime_type not in {"image/png", "image/jpeg", "image/webp", "image/svg+xml"}:
         image_bytes = _fallback_post_svg(
-            plan.platform,
-            plan.theme,
-            plan.post_angle,
+            platform,
+            theme,
+            post_angle,
             business_name,
             width,
             height,
@@ -726,10 +736,10 @@ def generate_plan_image(
 
     _ensure_bucket()
     ext = _mime_to_ext(mime_type)
-    file_name = f"plan_{plan.id}_{int(datetime.utcnow().timestamp())}.{ext}"
-    storage_path = str(Path(user_id) / "plans" / str(plan.id) / file_name).replace("\\", "/")
+    file_name = f"plan_{plan_id}_{int(datetime.utcnow().timestamp())}.{ext}"
+    storage_path = str(Path(user_id) / "plans" / str(plan_id) / file_name).replace("\\", "/")
 
-    upload = requests.post(
+    upload = http_client.post(
         f"{settings.supabase_url}/storage/v1/object/{settings.supabase_storage_bucket}/{storage_path}",
         headers={**_supabase_headers(mime_type), "x-upsert": "true"},
         data=image_bytes,
@@ -738,27 +748,43 @@ def generate_plan_image(
     if upload.status_code not in (200, 201):
         raise RuntimeError(f"Plan image upload failed: {upload.status_code} {upload.text[:200]}")
 
-    plan.image_url = _generate_signed_url(storage_path)
+    return RenderedPlanImage(
+        plan_id=plan_id,
+        file_name=Path(file_name).name,
+        storage_path=storage_path,
+        mime_type=mime_type,
+        file_size=len(image_bytes),
+        image_url=_generate_signed_url(storage_path),
+    )
+
+
+def apply_plan_image(
+    db: Session,
+    user_id: str,
+    plan: ContentPlan,
+    rendered: RenderedPlanImage,
+    attach_post_id: int | None = None,
+) -> ContentPlan:
+    plan.image_url = rendered.image_url
     plan.updated_at = datetime.utcnow()
 
-    if attach_post_id and mime_type in {"image/png", "image/jpeg"}:
+    if attach_post_id and rendered.mime_type in {"image/png", "image/jpeg"}:
         post = (
             db.query(GeneratedPost)
             .filter(GeneratedPost.id == attach_post_id, GeneratedPost.user_id == user_id)
             .first()
         )
         if post:
-            auto_name = Path(file_name).name
             db.add(
                 MediaAsset(
                     user_id=user_id,
                     post_id=post.id,
                     platform=post.platform,
-                    file_name=auto_name,
-                    mime_type=mime_type,
-                    file_size=len(image_bytes),
-                    storage_path=storage_path,
-                    file_url=plan.image_url,
+                    file_name=rendered.file_name,
+                    mime_type=rendered.mime_type,
+                    file_size=rendered.file_size,
+                    storage_path=rendered.storage_path,
+                    file_url=rendered.image_url,
                     upload_status="uploaded",
                     last_error="",
                 )
@@ -854,7 +880,7 @@ def generate_post_visual_from_template(
     file_name = f"post_{post.id}_{selected_template}_{int(datetime.utcnow().timestamp())}.{ext}"
     storage_path = str(Path(user_id) / "posts" / str(post.id) / file_name).replace("\\", "/")
 
-    upload = requests.post(
+    upload = http_client.post(
         f"{settings.supabase_url}/storage/v1/object/{settings.supabase_storage_bucket}/{storage_path}",
         headers={**_supabase_headers(mime_type), "x-upsert": "true"},
         data=image_bytes,
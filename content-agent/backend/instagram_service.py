@@ -1,17 +1,22 @@
 from __future__ import annotations
 
-import requests
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from backend import http_client
+from backend.credentials import Credential, CredentialCache, invalidate_credentials
 from backend.db_models import MediaAsset, SocialAccount
-from backend.security import decrypt_text, encrypt_text
+from backend.http_client import RequestFlow
+from backend.publish_queue import PermanentPublishError, raise_for_provider_status
+from backend.response_cache import CLIENTS, SOCIAL, invalidate_user
+from backend.security import encrypt_text
 from config.settings import settings
 
 GRAPH_BASE = "https://graph.facebook.com/v25.0"
 
 
 def _get_instagram_profile(account_id: str, access_token: str) -> dict:
-    resp = requests.get(
+    resp = http_client.get(
         f"{GRAPH_BASE}/{account_id}",
         params={"fields": "id,username", "access_token": access_token},
         timeout=30,
@@ -52,62 +57,77 @@ def connect_instagram_from_settings(db: Session, user_id: str) -> SocialAccount:
         db.add(row)
     db.commit()
     db.refresh(row)
+    invalidate_user(user_id, SOCIAL, CLIENTS)
+    invalidate_credentials(user_id, "instagram")
     return row
 
 
-def _create_media_container(account_id: str, token: str, image_url: str, caption: str) -> str:
-    resp = requests.post(
-        f"{GRAPH_BASE}/{account_id}/media",
-        data={
+def _create_media_container(account_id: str, token: str, image_url: str, caption: str) -> RequestFlow[str]:
+    resp = yield {
+        "method": "POST",
+        "url": f"{GRAPH_BASE}/{account_id}/media",
+        "data": {
             "image_url": image_url,
             "caption": caption,
             "access_token": token,
         },
-        timeout=45,
-    )
-    if resp.status_code >= 400:
-        raise RuntimeError(f"Instagram media create failed: {resp.status_code} {resp.text[:320]}")
+        "timeout": 45,
+    }
+    raise_for_provider_status(resp, "Instagram media create failed", limit=320)
     container_id = str(resp.json().get("id") or "").strip()
     if not container_id:
         raise RuntimeError("Instagram media container id missing")
     return container_id
 
 
-def _publish_media_container(account_id: str, token: str, container_id: str) -> str:
-    resp = requests.post(
-        f"{GRAPH_BASE}/{account_id}/media_publish",
-        data={"creation_id": container_id, "access_token": token},
-        timeout=45,
-    )
-    if resp.status_code >= 400:
-        raise RuntimeError(f"Instagram publish failed: {resp.status_code} {resp.text[:320]}")
+def _publish_media_container(account_id: str, token: str, container_id: str) -> RequestFlow[str]:
+    resp = yield {
+        "method": "POST",
+        "url": f"{GRAPH_BASE}/{account_id}/media_publish",
+        "data": {"creation_id": container_id, "access_token": token},
+        "timeout": 45,
+    }
+    raise_for_provider_status(resp, "Instagram publish failed", limit=320)
     post_id = str(resp.json().get("id") or "").strip()
     if not post_id:
         raise RuntimeError("Instagram publish id missing")
     return post_id
 
 
+def _publish_flow(credential: Credential | None, content: str, media_items: list[MediaAsset] | None) -> RequestFlow[dict]:
+    if not credential:
+        raise PermanentPublishError("Instagram account is not connected")
+
+    image_item = next((x for x in (media_items or []) if x.mime_type.startswith("image/")), None)
+    if not image_item:
+        raise PermanentPublishError("Instagram publish requires at least one image")
+    if not image_item.file_url:
+        raise PermanentPublishError("Instagram publish requires a signed media URL")
+
+    token = credential.access_token
+    container_id = yield from _create_media_container(credential.account_id, token, image_item.file_url, content)
+    external_post_id = yield from _publish_media_container(credential.account_id, token, container_id)
+    return {"external_post_id": external_post_id}
+
+
 def publish_to_instagram(
     db: Session,
     user_id: str,
     content: str,
     media_items: list[MediaAsset] | None = None,
+    credentials: CredentialCache | None = None,
 ) -> dict:
-    account = (
-        db.query(SocialAccount)
-        .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "instagram")
-        .first()
-    )
-    if not account:
-        raise RuntimeError("Instagram account is not connected")
+    credential = (credentials or CredentialCache()).get(db, user_id, "instagram")
+    return http_client.run_flow(_publish_flow(credential, content, media_items))
 
-    image_item = next((x for x in (media_items or []) if x.mime_type.startswith("image/")), None)
-    if not image_item:
-        raise RuntimeError("Instagram publish requires at least one image")
-    if not image_item.file_url:
-        raise RuntimeError("Instagram publish requires a signed media URL")
 
-    token = decrypt_text(account.access_token_enc)
-    container_id = _create_media_container(account.account_id, token, image_item.file_url, content)
-    external_post_id = _publish_media_container(account.account_id, token, container_id)
-    return {"external_post_id": external_post_id}
+async def publish_to_instagram_async(
+    db: AsyncSession,
+    user_id: str,
+    content: str,
+    media_items: list[MediaAsset] | None = None,
+    credentials: CredentialCache | None = None,
+) -> dict:
+    credential = await (credentials or CredentialCache()).aget(db, user_id, "instagram")
+    await db.commit()
+    return await http_client.arun_flow(_publish_flow(credential, content, media_items))
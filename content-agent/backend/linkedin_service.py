@@ -1,14 +1,19 @@
 from datetime import datetime, timedelta, timezone
 from urllib.parse import urlencode
 
-import requests
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from config.settings import settings
+from backend import http_client
+from backend.credentials import Credential, CredentialCache, invalidate_credentials
 from backend.db_models import MediaAsset, OAuthState, SocialAccount
-from backend.media_service import download_media_bytes
-from backend.security import decrypt_text, encrypt_text
+from backend.http_client import RequestFlow
+from backend.media_service import download_media_flow
+from backend.publish_queue import PermanentPublishError, ProviderUnavailableError, is_transient, raise_for_provider_status
+from backend.response_cache import CLIENTS, SOCIAL, invalidate_user
+from backend.security import encrypt_text
 
 
 LINKEDIN_AUTH_URL = "https://www.linkedin.com/oauth/v2/authorization"
@@ -43,7 +48,7 @@ def create_linkedin_authorization_url(db: Session, user_id: str) -> str:
 
 
 def _exchange_code_for_token(code: str) -> dict:
-    response = requests.post(
+    response = http_client.post(
         LINKEDIN_TOKEN_URL,
         data={
             "grant_type": "authorization_code",
@@ -59,7 +64,7 @@ def _exchange_code_for_token(code: str) -> dict:
 
 
 def _fetch_userinfo(access_token: str) -> dict:
-    response = requests.get(
+    response = http_client.get(
         LINKEDIN_USERINFO_URL,
         headers={"Authorization": f"Bearer {access_token}"},
         timeout=30,
@@ -121,10 +126,12 @@ def handle_linkedin_callback(db: Session, code: str, state: str) -> str:
 
     db.delete(state_row)
     db.commit()
+    invalidate_user(user_id, SOCIAL, CLIENTS)
+    invalidate_credentials(user_id, "linkedin")
     return user_id
 
 
-def _register_linkedin_asset(token: str, owner_urn: str, mime_type: str) -> tuple[str, str]:
+def _register_linkedin_asset(token: str, owner_urn: str, mime_type: str) -> RequestFlow[tuple[str, str]]:
     recipe = "urn:li:digitalmediaRecipe:feedshare-image"
     if mime_type == "application/pdf":
         recipe = "urn:li:digitalmediaRecipe:feedshare-document"
@@ -136,17 +143,18 @@ def _register_linkedin_asset(token: str, owner_urn: str, mime_type: str) -> tupl
             "serviceRelationships": [{"relationshipType": "OWNER", "identifier": "urn:li:userGeneratedContent"}],
         }
     }
-    resp = requests.post(
-        LINKEDIN_ASSETS_URL,
-        json=payload,
-        headers={
+    resp = yield {
+        "method": "POST",
+        "url": LINKEDIN_ASSETS_URL,
+        "json": payload,
+        "headers": {
             "Authorization": f"Bearer {token}",
             "X-Restli-Protocol-Version": "2.0.0",
             "Content-Type": "application/json",
         },
-        timeout=30,
-    )
-    resp.raise_for_status()
+        "timeout": 30,
+    }
+    raise_for_provider_status(resp, "LinkedIn asset register failed")
     data = resp.json().get("value", {})
     asset = data.get("asset", "")
     upload_url = (
@@ -159,57 +167,55 @@ def _register_linkedin_asset(token: str, owner_urn: str, mime_type: str) -> tupl
     return asset, upload_url
 
 
-def _upload_linkedin_binary(upload_url: str, token: str, mime_type: str, content: bytes) -> None:
-    upload_resp = requests.put(
-        upload_url,
-        data=content,
-        headers={
+def _upload_linkedin_binary(upload_url: str, token: str, mime_type: str, content: bytes) -> RequestFlow[None]:
+    upload_resp = yield {
+        "method": "PUT",
+        "url": upload_url,
+        "data": content,
+        "headers": {
             "Authorization": f"Bearer {token}",
             "Content-Type": mime_type,
         },
-        timeout=60,
-    )
-    if upload_resp.status_code >= 400:
-        raise RuntimeError(f"LinkedIn binary upload failed: {upload_resp.status_code} {upload_resp.text[:200]}")
+        "timeout": 60,
+    }
+    raise_for_provider_status(upload_resp, "LinkedIn binary upload failed", limit=200)
 
 
-def _ensure_linkedin_media_assets(token: str, owner_urn: str, media_items: list[MediaAsset]) -> None:
+def _ensure_linkedin_media_assets(token: str, owner_urn: str, media_items: list[MediaAsset]) -> RequestFlow[None]:
     for item in media_items:
         if item.platform_asset_id:
             continue
 
-        last_error = ""
+        last_exc: Exception | None = None
         for _ in range(3):
             try:
-                asset, upload_url = _register_linkedin_asset(token, owner_urn, item.mime_type)
-                blob = download_media_bytes(item.storage_path)
-                _upload_linkedin_binary(upload_url, token, item.mime_type, blob)
+                asset, upload_url = yield from _register_linkedin_asset(token, owner_urn, item.mime_type)
+                blob = yield from download_media_flow(item.storage_path)
+                yield from _upload_linkedin_binary(upload_url, token, item.mime_type, blob)
                 item.platform_asset_id = asset
                 item.upload_status = "uploaded"
                 item.last_error = ""
                 break
             except Exception as exc:
-                last_error = str(exc)
+                last_exc = exc
                 item.upload_status = "failed"
-                item.last_error = last_error
+                item.last_error = str(exc)
+                if not is_transient(exc):
+                    break
 
         if not item.platform_asset_id:
-            raise RuntimeError(f"Media upload failed for {item.file_name}: {last_error}")
+            error_type = ProviderUnavailableError if last_exc and is_transient(last_exc) else PermanentPublishError
+            raise error_type(f"Media upload failed for {item.file_name}: {last_exc}") from last_exc
 
 
-def publish_to_linkedin(db: Session, user_id: str, content: str, media_items: list[MediaAsset] | None = None) -> dict:
-    account = (
-        db.query(SocialAccount)
-        .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "linkedin")
-        .first()
-    )
-    if not account:
-        raise RuntimeError("LinkedIn account is not connected")
+def _publish_flow(credential: Credential | None, content: str, media_items: list[MediaAsset] | None) -> RequestFlow[dict]:
+    if not credential:
+        raise PermanentPublishError("LinkedIn account is not connected")
 
-    token = decrypt_text(account.access_token_enc)
-    author = f"urn:li:person:{account.account_id}"
+    token = credential.access_token
+    author = f"urn:li:person:{credential.account_id}"
     media_items = media_items or []
-    _ensure_linkedin_media_assets(token, author, media_items)
+    yield from _ensure_linkedin_media_assets(token, author, media_items)
 
     share_media_category = "NONE"
     share_media = []
@@ -240,23 +246,48 @@ def publish_to_linkedin(db: Session, user_id: str, content: str, media_items: li
         "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"},
     }
 
-    response = requests.post(
-        LINKEDIN_UGC_POST_URL,
-        json=payload,
-        headers={
+    response = yield {
+        "method": "POST",
+        "url": LINKEDIN_UGC_POST_URL,
+        "json": payload,
+        "headers": {
             "Authorization": f"Bearer {token}",
             "X-Restli-Protocol-Version": "2.0.0",
             "Content-Type": "application/json",
         },
-        timeout=30,
-    )
-
-    if response.status_code >= 400:
-        raise RuntimeError(f"LinkedIn publish failed: {response.status_code} {response.text[:300]}")
+        "timeout": 30,
+    }
 
-    db.commit()
+    raise_for_provider_status(response, "LinkedIn publish failed")
 
     return {
         "external_post_id": response.headers.get("x-restli-id", ""),
         "status_code": response.status_code,
     }
+
+
+def publish_to_linkedin(
+    db: Session,
+    user_id: str,
+    content: str,
+    media_items: list[MediaAsset] | None = None,
+    credentials: CredentialCache | None = None,
+) -> dict:
+    credential = (credentials or CredentialCache()).get(db, user_id, "linkedin")
+    result = http_client.run_flow(_publish_flow(credential, content, media_items))
+    db.commit()
+    return result
+
+
+async def publish_to_linkedin_async(
+    db: AsyncSession,
+    user_id: str,
+    content: str,
+    media_items: list[MediaAsset] | None = None,
+    credentials: CredentialCache | None = None,
+) -> dict:
+    credential = await (credentials or CredentialCache()).aget(db, user_id, "linkedin")
+    await db.commit()
+    result = await http_client.arun_flow(_publish_flow(credential, content, media_items))
+    await db.commit()
+    return result
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from config.settings import settings
+
+
+def cache_key(**request) -> str:
+    """Stable hash of everything that shapes a completion (models, prompt, temperature, format)."""
+    raw = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class MemoryTier:
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = max(1, ttl_seconds)
+        self._items: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, expires_at: float | None = None) -> None:
+        with self._lock:
+            self._items[key] = (expires_at or time.time() + self.ttl_seconds, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class SQLiteTier:
+    """Shared on-disk tier so restarts and sibling processes reuse completions."""
+
+    def __init__(self, path: str, max_rows: int, ttl_seconds: int) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_rows = max(1, max_rows)
+        self.ttl_seconds = max(1, ttl_seconds)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute(
+            "create table if not exists llm_cache ("
+            "key text primary key, value text not null, expires_at real not null, created_at real not null)"
+        )
+        self._conn.execute("create index if not exists idx_llm_cache_expires on llm_cache (expires_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "select value, expires_at from llm_cache where key = ? and expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "insert or replace into llm_cache (key, value, expires_at, created_at) values (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now),
+            )
+            self._conn.execute("delete from llm_cache where expires_at <= ?", (now,))
+            self._conn.execute(
+                "delete from llm_cache where key in ("
+                "select key from llm_cache order by created_at desc limit -1 offset ?)",
+                (self.max_rows,),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("delete from llm_cache")
+            self._conn.commit()
+
+
+class LLMCache:
+    def __init__(self, memory: MemoryTier, disk: SQLiteTier | None = None) -> None:
+        self.memory = memory
+        self.disk = disk
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def get(self, key: str) -> str | None:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("hits")
+            return value
+        if self.disk is not None:
+            found = self.disk.get(key)
+            if found is not None:
+                value, expires_at = found
+                self.memory.set(key, value, expires_at)
+                self._count("disk_hits")
+                return value
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+        self._count("stores")
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            data = dict(self._stats)
+        data["memory_entries"] = len(self.memory)
+        data["disk_enabled"] = self.disk is not None
+        return data
+
+
+_cache: LLMCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache | None:
+    if not settings.llm_cache_enabled:
+        return None
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            disk = None
+            if settings.llm_cache_sqlite_path:
+                disk = SQLiteTier(
+                    settings.llm_cache_sqlite_path,
+                    settings.llm_cache_sqlite_max_rows,
+                    settings.llm_cache_ttl_seconds,
+                )
+            _cache = LLMCache(
+                MemoryTier(settings.llm_cache_max_entries, settings.llm_cache_ttl_seconds),
+                disk,
+            )
+        return _cache
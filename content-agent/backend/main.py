@@ -1,17 +1,26 @@
-from datetime import datetime
+import asyncio
+import base64
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, PlainTextResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer
 
+from backend import http_client
 from backend.ai_service import generate_platform_posts
 from backend.analytics_service import aggregate_metrics, record_publish_metric, resolve_post_client_id
-from backend.auth import get_current_user_id
+from backend.auth import get_current_user_id, jwks_cache
+from backend.billing_service import apply_payment_auto_pause
+from backend.bulk import insert_returning, insert_rows, keep_loaded_on_commit
 from backend.canva_service import create_canva_authorization_url, handle_canva_callback
-from backend.database import SessionLocal, get_db, init_db
+from backend.database import SessionLocal, dispose_async_engine, get_async_db, get_db, init_db, pool_stats
 from backend.db_models import (
     AgentRun,
     ApprovalRequest,
@@ -28,18 +37,45 @@ from backend.db_models import (
     ResearchItem,
     SocialAccount,
 )
-from backend.instagram_service import connect_instagram_from_settings, publish_to_instagram
-from backend.linkedin_service import create_linkedin_authorization_url, handle_linkedin_callback, publish_to_linkedin
-from backend.facebook_service import connect_facebook_from_settings, publish_to_facebook
-from backend.image_service import generate_plan_image, generate_post_visual_from_template, list_canva_templates
-from backend.media_service import list_post_media, refresh_media_signed_urls, upload_media_base64
+from backend.instagram_service import connect_instagram_from_settings, publish_to_instagram_async
+from backend.linkedin_service import (
+    create_linkedin_authorization_url,
+    handle_linkedin_callback,
+    publish_to_linkedin_async,
+)
+from backend.facebook_service import connect_facebook_from_settings, publish_to_facebook_async
+from backend.image_service import (
+    apply_plan_image,
+    generate_post_visual_from_template,
+    list_canva_templates,
+    render_plan_image,
+)
+from backend.media_service import (
+    list_post_media,
+    refresh_media_signed_urls,
+    refresh_media_signed_urls_async,
+    upload_media_base64,
+)
 from backend.planning_service import create_content_plans
+from backend.publish_queue import (
+    CircuitOpenError,
+    PermanentPublishError,
+    breaker_for,
+    claim_publish_lease,
+    is_transient,
+    mark_post_sent,
+    release_publish_lease,
+    reset_retries,
+    schedule_retry,
+)
 from backend.research_service import collect_research_items
-from backend.scheduler import create_scheduler
+from backend.response_cache import CLIENTS, METRICS, PAYMENTS, POSTS, SOCIAL, cached_json, invalidate_user
+from backend.scheduler import create_scheduler, notify_schedule_change
 from backend.twitter_service import create_twitter_authorization_url, handle_twitter_callback
 from backend.whatsapp_service import request_whatsapp_approval, resolve_whatsapp_approval, verify_webhook
 from backend.schemas import (
     AgentRunResponse,
+    AgentRunStatusResponse,
     AnalyticsOverviewResponse,
     AnalyticsPoint,
     CanvaTemplateResponse,
@@ -84,16 +120,22 @@ app.add_middleware(
 )
 
 scheduler = None
+agent_executor = ThreadPoolExecutor(max_workers=settings.agent_run_workers, thread_name_prefix="agent-run")
+agent_stage_executor = ThreadPoolExecutor(max_workers=settings.agent_stage_workers, thread_name_prefix="agent-stage")
 FRONTEND_DIR = Path(__file__).resolve().parent.parent / "frontend"
 
 
-def _serialize_post(post: GeneratedPost) -> DraftPost:
+def _truncate(value: str, limit: int) -> str:
+    return value[:limit] if limit and len(value) > limit else value
+
+
+def _serialize_post(post: GeneratedPost, include_input: bool = True, text_limit: int = 0) -> DraftPost:
     return DraftPost(
         id=post.id,
         platform=post.platform,
-        input_content=post.input_content,
-        generated_text=post.generated_text,
-        edited_text=post.edited_text,
+        input_content=_truncate(post.input_content, text_limit) if include_input else "",
+        generated_text=_truncate(post.generated_text, text_limit),
+        edited_text=_truncate(post.edited_text, text_limit),
         status=post.status,
         scheduled_at=post.scheduled_at,
         posted_at=post.posted_at,
@@ -145,24 +187,6 @@ def _serialize_plan(item: ContentPlan) -> ContentPlanResponse:
     )
 
 
-def _ensure_approval_request(db: Session, user_id: str, post_id: int) -> None:
-    row = (
-        db.query(ApprovalRequest)
-        .filter(ApprovalRequest.user_id == user_id, ApprovalRequest.post_id == post_id)
-        .first()
-    )
-    if row:
-        return
-    db.add(
-        ApprovalRequest(
-            user_id=user_id,
-            post_id=post_id,
-            status="pending",
-            requested_at=datetime.utcnow(),
-        )
-    )
-
-
 def _touch_publish_job(
     db: Session,
     post: GeneratedPost,
@@ -172,7 +196,7 @@ def _touch_publish_job(
     scheduled_at: datetime | None = None,
     attempted: bool = False,
     completed: bool = False,
-) -> None:
+) -> PublishJob:
     row = (
         db.query(PublishJob)
         .filter(PublishJob.user_id == post.user_id, PublishJob.post_id == post.id)
@@ -193,11 +217,16 @@ def _touch_publish_job(
         if scheduled_at is not None:
             row.scheduled_at = scheduled_at
         row.error_message = error_message
+    if status == "scheduled" and scheduled_at is not None:
+        # A fresh schedule from the user starts a fresh retry budget.
+        reset_retries(row)
     now = datetime.utcnow()
     if attempted:
         row.attempted_at = now
     if completed:
         row.completed_at = now
+        row.next_attempt_at = None
+    return row
 
 
 def _ensure_client(db: Session, user_id: str, client_id: int) -> ClientProfile:
@@ -207,61 +236,45 @@ def _ensure_client(db: Session, user_id: str, client_id: int) -> ClientProfile:
     return row
 
 
-def _apply_payment_auto_pause(db: Session, user_id: str) -> None:
+def _insert_generated_posts(db: Session, posts: list[dict], client_id: int | None, job_status: str) -> list[GeneratedPost]:
+    """Insert brand-new posts plus their approval, publish-job and client-link rows in a few set-based statements."""
+    created = insert_returning(db, GeneratedPost, posts)
     now = datetime.utcnow()
-    clients = db.query(ClientProfile).filter(ClientProfile.user_id == user_id).all()
-    if not clients:
-        return
-
-    payment_rows = db.query(ClientPayment).filter(ClientPayment.user_id == user_id).all()
-    by_client: dict[int, list[ClientPayment]] = {}
-    for row in payment_rows:
-        by_client.setdefault(row.client_id, []).append(row)
-
-    changed = False
-    for client in clients:
-        rows = by_client.get(client.id, [])
-        should_pause = False
-        for payment in rows:
-            status = (payment.subscription_status or "").strip().lower()
-            if not payment.auto_pause_if_unpaid:
-                continue
-            if status in {"unpaid", "paused", "cancelled"}:
-                should_pause = True
-                break
-            if status == "past_due" and payment.due_date and payment.due_date <= now:
-                should_pause = True
-                break
-        if client.service_paused != should_pause:
-            client.service_paused = should_pause
-            changed = True
-
-    if changed:
-        db.commit()
-
-
-def _upsert_post_client_link(db: Session, user_id: str, client_id: int, post_id: int) -> None:
-    row = (
-        db.query(PostClientLink)
-        .filter(PostClientLink.user_id == user_id, PostClientLink.post_id == post_id)
-        .first()
+    insert_rows(
+        db,
+        ApprovalRequest,
+        [{"user_id": row.user_id, "post_id": row.id, "status": "pending", "requested_at": now} for row in created],
     )
-    if row:
-        row.client_id = client_id
-        return
-    db.add(PostClientLink(user_id=user_id, client_id=client_id, post_id=post_id))
+    insert_rows(
+        db,
+        PublishJob,
+        [
+            {
+                "user_id": row.user_id,
+                "post_id": row.id,
+                "platform": row.platform,
+                "status": job_status,
+                "scheduled_at": row.scheduled_at,
+                "error_message": "",
+            }
+            for row in created
+        ],
+    )
+    if client_id:
+        insert_rows(
+            db,
+            PostClientLink,
+            [{"user_id": row.user_id, "client_id": client_id, "post_id": row.id} for row in created],
+        )
+    return created
 
 
-def _upsert_plan_client_link(db: Session, user_id: str, client_id: int, plan_id: int) -> None:
-    row = (
-        db.query(PlanClientLink)
-        .filter(PlanClientLink.user_id == user_id, PlanClientLink.plan_id == plan_id)
-        .first()
+def _link_plans_to_client(db: Session, user_id: str, client_id: int, plans: list[ContentPlan]) -> None:
+    insert_rows(
+        db,
+        PlanClientLink,
+        [{"user_id": user_id, "client_id": client_id, "plan_id": plan.id} for plan in plans],
     )
-    if row:
-        row.client_id = client_id
-        return
-    db.add(PlanClientLink(user_id=user_id, client_id=client_id, plan_id=plan_id))
 
 
 def _client_connected_accounts(db: Session, user_id: str) -> list[str]:
@@ -273,36 +286,51 @@ def _client_connected_accounts(db: Session, user_id: str) -> list[str]:
     return sorted({r.platform for r in rows})
 
 
-def _next_scheduled_for_client(db: Session, user_id: str, client_id: int) -> datetime | None:
-    row = (
-        db.query(GeneratedPost)
-        .join(PostClientLink, PostClientLink.post_id == GeneratedPost.id)
+def _next_scheduled_by_client(db: Session, user_id: str, client_ids: list[int]) -> dict[int, datetime]:
+    if not client_ids:
+        return {}
+    rows = (
+        db.query(PostClientLink.client_id, func.min(GeneratedPost.scheduled_at))
+        .join(GeneratedPost, PostClientLink.post_id == GeneratedPost.id)
         .filter(
             PostClientLink.user_id == user_id,
-            PostClientLink.client_id == client_id,
+            PostClientLink.client_id.in_(client_ids),
             GeneratedPost.status == PostStatus.scheduled.value,
             GeneratedPost.scheduled_at.isnot(None),
         )
-        .order_by(GeneratedPost.scheduled_at.asc())
-        .first()
+        .group_by(PostClientLink.client_id)
+        .all()
     )
-    return row.scheduled_at if row else None
+    return {client_id: scheduled_at for client_id, scheduled_at in rows}
 
 
-def _client_engagement(db: Session, user_id: str, client_id: int) -> tuple[int, int, int, int]:
+def _engagement_by_client(db: Session, user_id: str, client_ids: list[int]) -> dict[int, tuple[int, int, int, int]]:
+    if not client_ids:
+        return {}
     rows = (
-        db.query(ClientPerformanceMetric)
-        .filter(ClientPerformanceMetric.user_id == user_id, ClientPerformanceMetric.client_id == client_id)
+        db.query(
+            ClientPerformanceMetric.client_id,
+            func.coalesce(func.sum(ClientPerformanceMetric.likes), 0),
+            func.coalesce(func.sum(ClientPerformanceMetric.shares), 0),
+            func.coalesce(func.sum(ClientPerformanceMetric.clicks), 0),
+            func.coalesce(func.sum(ClientPerformanceMetric.follower_growth), 0),
+        )
+        .filter(ClientPerformanceMetric.user_id == user_id, ClientPerformanceMetric.client_id.in_(client_ids))
+        .group_by(ClientPerformanceMetric.client_id)
         .all()
     )
-    likes = sum(int(x.likes or 0) for x in rows)
-    shares = sum(int(x.shares or 0) for x in rows)
-    clicks = sum(int(x.clicks or 0) for x in rows)
-    followers = sum(int(x.follower_growth or 0) for x in rows)
-    return likes, shares, clicks, followers
+    return {
+        client_id: (int(likes), int(shares), int(clicks), int(followers))
+        for client_id, likes, shares, clicks, followers in rows
+    }
 
 
-def _build_onboarding_status(db: Session, user_id: str, client: ClientProfile) -> ClientOnboardingStatusResponse:
+def _build_onboarding_status(
+    db: Session,
+    user_id: str,
+    client: ClientProfile,
+    connected_accounts: list[str] | None = None,
+) -> ClientOnboardingStatusResponse:
     questionnaire_done = all(
         [
             client.business_name.strip(),
@@ -321,7 +349,9 @@ def _build_onboarding_status(db: Session, user_id: str, client: ClientProfile) -
             client.target_audience.strip(),
         ]
     )
-    connected = len(_client_connected_accounts(db, user_id)) > 0
+    if connected_accounts is None:
+        connected_accounts = _client_connected_accounts(db, user_id)
+    connected = len(connected_accounts) > 0
 
     steps = [
         ClientOnboardingStep(key="questionnaire", title="Questionnaire", done=questionnaire_done),
@@ -332,37 +362,64 @@ def _build_onboarding_status(db: Session, user_id: str, client: ClientProfile) -
     return ClientOnboardingStatusResponse(client_id=client.id, status=status, steps=steps)
 
 
+def _sync_onboarding_status(db: Session, user_id: str, rows: list[ClientProfile] | None = None) -> None:
+    """Re-derive and stage ``onboarding_status`` (all of the user's clients by default); the caller commits.
+
+    Called from the writes that can change it (client edits, social connects) so client reads never write.
+    """
+    if rows is None:
+        rows = db.query(ClientProfile).filter(ClientProfile.user_id == user_id).all()
+    if not rows:
+        return
+    connected_accounts = _client_connected_accounts(db, user_id)
+    for row in rows:
+        status = _build_onboarding_status(db, user_id, row, connected_accounts).status
+        if row.onboarding_status != status:
+            row.onboarding_status = status
+
+
+def _serialize_clients(db: Session, user_id: str, rows: list[ClientProfile]) -> list[ClientResponse]:
+    """Serialize many clients with a fixed number of queries: accounts once, then one GROUP BY per aggregate."""
+    client_ids = [row.id for row in rows]
+    connected_accounts = _client_connected_accounts(db, user_id)
+    engagement = _engagement_by_client(db, user_id, client_ids)
+    next_scheduled = _next_scheduled_by_client(db, user_id, client_ids)
+
+    out: list[ClientResponse] = []
+    for row in rows:
+        onboarding = _build_onboarding_status(db, user_id, row, connected_accounts)
+        likes, shares, clicks, followers = engagement.get(row.id, (0, 0, 0, 0))
+        out.append(
+            ClientResponse(
+                id=row.id,
+                business_name=row.business_name,
+                industry=row.industry,
+                social_handles=row.social_handles,
+                website=row.website,
+                brand_voice=row.brand_voice,
+                keywords=row.keywords,
+                topics_to_avoid=row.topics_to_avoid,
+                target_audience=row.target_audience,
+                whatsapp_number=row.whatsapp_number,
+                logo_url=row.logo_url,
+                onboarding_status=onboarding.status,
+                service_paused=row.service_paused,
+                notes=row.notes,
+                next_scheduled_post=next_scheduled.get(row.id),
+                connected_accounts=connected_accounts,
+                engagement_likes=likes,
+                engagement_shares=shares,
+                engagement_clicks=clicks,
+                follower_growth=followers,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+            )
+        )
+    return out
+
+
 def _serialize_client(db: Session, user_id: str, row: ClientProfile) -> ClientResponse:
-    likes, shares, clicks, followers = _client_engagement(db, user_id, row.id)
-    onboarding = _build_onboarding_status(db, user_id, row)
-    if row.onboarding_status != onboarding.status:
-        row.onboarding_status = onboarding.status
-        db.commit()
-        db.refresh(row)
-    return ClientResponse(
-        id=row.id,
-        business_name=row.business_name,
-        industry=row.industry,
-        social_handles=row.social_handles,
-        website=row.website,
-        brand_voice=row.brand_voice,
-        keywords=row.keywords,
-        topics_to_avoid=row.topics_to_avoid,
-        target_audience=row.target_audience,
-        whatsapp_number=row.whatsapp_number,
-        logo_url=row.logo_url,
-        onboarding_status=row.onboarding_status,
-        service_paused=row.service_paused,
-        notes=row.notes,
-        next_scheduled_post=_next_scheduled_for_client(db, user_id, row.id),
-        connected_accounts=_client_connected_accounts(db, user_id),
-        engagement_likes=likes,
-        engagement_shares=shares,
-        engagement_clicks=clicks,
-        follower_growth=followers,
-        created_at=row.created_at,
-        updated_at=row.updated_at,
-    )
+    return _serialize_clients(db, user_id, [row])[0]
 
 
 def _serialize_payment(db: Session, payment: ClientPayment) -> PaymentResponse:
@@ -396,14 +453,22 @@ def _assert_post_client_active(db: Session, user_id: str, post_id: int) -> None:
 def startup() -> None:
     global scheduler
     init_db()
+    _fail_stale_agent_runs()
+    # Fetch signing keys now so the first authenticated request doesn't wait on Supabase.
+    jwks_cache.warm()
     scheduler = create_scheduler(SessionLocal)
     scheduler.start()
 
 
 @app.on_event("shutdown")
-def shutdown() -> None:
+async def shutdown() -> None:
     if scheduler:
         scheduler.shutdown(wait=False)
+    agent_executor.shutdown(wait=False)
+    agent_stage_executor.shutdown(wait=False)
+    http_client.close()
+    await http_client.aclose()
+    await dispose_async_engine()
 
 
 @app.get("/health")
@@ -411,16 +476,22 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-def _run_agent_workflow(
+@app.get("/health/db-pool")
+def health_db_pool(user_id: str = Depends(get_current_user_id)) -> dict:
+    # Pool internals describe the whole deployment, so unlike /health they are not public.
+    return pool_stats()
+
+
+def _start_agent_run(
     db: Session,
     user_id: str,
     payload: GenerateRequest,
-) -> tuple[AgentRun, list[ResearchItem], list[ContentPlan], list[GeneratedPost]]:
+) -> AgentRun:
     content = payload.content.strip()
     if not content:
         raise HTTPException(status_code=400, detail="Content cannot be empty")
 
-    _apply_payment_auto_pause(db, user_id)
+    apply_payment_auto_pause(db, user_id)
 
     client: ClientProfile | None = None
     if payload.client_id:
@@ -429,14 +500,6 @@ def _run_agent_workflow(
             raise HTTPException(status_code=403, detail="Client service is paused due to unpaid subscription")
 
     platforms = payload.platforms or ["linkedin", "instagram", "facebook"]
-    profile_context = (
-        f"Business={payload.business_name or (client.business_name if client else '')}; "
-        f"Niche={payload.niche or (client.industry if client else '')}; "
-        f"Audience={payload.audience or (client.target_audience if client else '')}; "
-        f"Tone={payload.tone or (client.brand_voice if client else '')}; "
-        f"Region={payload.region}; Platforms={','.join(platforms)}"
-    )
-
     run = AgentRun(
         user_id=user_id,
         business_name=(payload.business_name.strip() or (client.business_name if client else "")),
@@ -447,141 +510,267 @@ def _run_agent_workflow(
         platforms_csv=",".join(platforms),
         language_pref=payload.language_pref,
         source_content=content,
-        status="running",
+        status="queued",
     )
     db.add(run)
     db.commit()
     db.refresh(run)
+    return run
+
+
+def _fail_agent_run(db: Session, run: AgentRun, error: str) -> None:
+    run.status = "failed"
+    run.error_text = error
+    run.completed_at = datetime.utcnow()
+    db.commit()
+
 
+def _fail_stale_agent_runs() -> None:
+    # Runs live in this process's executor, so a restart strands them mid-stage and pollers would wait forever.
+    # Only old ones are swept: other replicas may still be working on recent runs.
+    cutoff = datetime.utcnow() - timedelta(minutes=max(1, settings.agent_run_stale_minutes))
+    db = SessionLocal()
     try:
-        research_items = collect_research_items(
-            db=db,
-            user_id=user_id,
-            run_id=run.id,
-            business_name=run.business_name,
-            niche=run.niche,
-            region=payload.region,
-            audience=run.audience,
-        )
-        plans = create_content_plans(
-            db=db,
-            user_id=user_id,
-            run_id=run.id,
-            platforms=platforms,
-            language_pref=payload.language_pref,
-            timezone_name=settings.timezone,
-            research_items=research_items,
-            business_name=run.business_name,
-            niche=run.niche,
-            audience=run.audience,
-            tone=run.tone,
-            region=payload.region,
-            posts_per_week=3,
+        db.query(AgentRun).filter(
+            AgentRun.status.notin_(["completed", "failed"]),
+            AgentRun.created_at < cutoff,
+        ).update(
+            {
+                AgentRun.status: "failed",
+                AgentRun.error_text: "Run was interrupted before it finished. Please start it again.",
+                AgentRun.completed_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
         )
+        db.commit()
+    finally:
+        db.close()
 
-        research_summary = "\n".join(
-            [f"- {x.title}: {x.snippet[:180]}" for x in research_items[:3] if x.title]
-        )
-        source_text = f"{content}\n\nResearch highlights:\n{research_summary}".strip()
-        outputs = generate_platform_posts(
-            content=source_text,
-            platforms=platforms,
-            language_pref=payload.language_pref,
-            profile_context=profile_context,
-        )
-        created_posts: list[GeneratedPost] = []
-        for platform, text in outputs.items():
-            row = GeneratedPost(
+
+def _set_run_stage(db: Session, run: AgentRun, stage: str) -> None:
+    run.status = stage
+    db.commit()
+
+
+def _execute_agent_run(
+    db: Session,
+    run: AgentRun,
+    payload: GenerateRequest,
+) -> tuple[AgentRun, list[ResearchItem], list[ContentPlan], list[GeneratedPost]]:
+    user_id = run.user_id
+    content = run.source_content
+    platforms = [x for x in run.platforms_csv.split(",") if x]
+    profile_context = (
+        f"Business={run.business_name}; "
+        f"Niche={run.niche}; "
+        f"Audience={run.audience}; "
+        f"Tone={run.tone}; "
+        f"Region={payload.region}; Platforms={','.join(platforms)}"
+    )
+
+    with keep_loaded_on_commit(db):
+        try:
+            client: ClientProfile | None = None
+            if payload.client_id:
+                client = _ensure_client(db, user_id, payload.client_id)
+            _set_run_stage(db, run, "researching")
+            research_items = collect_research_items(
+                db=db,
                 user_id=user_id,
-                platform=platform,
-                input_content=content,
-                generated_text=text,
-                edited_text="",
-                status=PostStatus.draft.value,
+                run_id=run.id,
+                business_name=run.business_name,
+                niche=run.niche,
+                region=payload.region,
+                audience=run.audience,
+            )
+            research_summary = "\n".join(
+                [f"- {x.title}: {x.snippet[:180]}" for x in research_items[:3] if x.title]
+            )
+            source_text = f"{content}\n\nResearch highlights:\n{research_summary}".strip()
+            # Text generation only needs the research highlights, so it runs while plans are written.
+            outputs_future = agent_stage_executor.submit(
+                generate_platform_posts,
+                content=source_text,
+                platforms=platforms,
+                language_pref=payload.language_pref,
+                profile_context=profile_context,
             )
-            db.add(row)
-            created_posts.append(row)
-
-        db.commit()
-        for row in created_posts:
-            db.refresh(row)
-            _ensure_approval_request(db, user_id, row.id)
-            _touch_publish_job(db, row, status="draft")
-            if client:
-                _upsert_post_client_link(db, user_id, client.id, row.id)
-        if client:
-            for plan in plans:
-                _upsert_plan_client_link(db, user_id, client.id, plan.id)
-        db.commit()
 
-        if settings.auto_generate_plan_images_on_run:
-            # Optional mode: auto-generate one visual per platform and attach it to matching draft.
-            posts_by_platform: dict[str, GeneratedPost] = {}
-            for row in created_posts:
-                posts_by_platform.setdefault(row.platform, row)
+            _set_run_stage(db, run, "planning")
+            try:
+                plans = create_content_plans(
+                    db=db,
+                    user_id=user_id,
+                    run_id=run.id,
+                    platforms=platforms,
+                    language_pref=payload.language_pref,
+                    timezone_name=settings.timezone,
+                    research_items=research_items,
+                    business_name=run.business_name,
+                    niche=run.niche,
+                    audience=run.audience,
+                    tone=run.tone,
+                    region=payload.region,
+                    posts_per_week=3,
+                )
+            except Exception:
+                outputs_future.cancel()
+                raise
+
+            # Optional mode: one visual per platform, rendered as soon as its plan exists and attached to the draft later.
             plans_by_platform: dict[str, ContentPlan] = {}
             for plan in plans:
                 plans_by_platform.setdefault(plan.platform, plan)
-            for platform, post in posts_by_platform.items():
-                plan = plans_by_platform.get(platform)
-                if not plan:
-                    continue
-                try:
-                    generate_plan_image(
-                        db=db,
+            render_futures: dict[str, Future] = {}
+            if settings.auto_generate_plan_images_on_run:
+                for platform, plan in plans_by_platform.items():
+                    if platform not in platforms:
+                        continue
+                    render_futures[platform] = agent_stage_executor.submit(
+                        render_plan_image,
                         user_id=user_id,
                         plan_id=plan.id,
+                        platform=plan.platform,
+                        theme=plan.theme,
+                        post_angle=plan.post_angle,
+                        image_prompt=plan.image_prompt,
                         business_name=run.business_name,
                         source_text=content,
-                        attach_post_id=post.id,
                     )
-                except Exception:
-                    # Do not fail draft creation if visual generation has a provider/runtime issue.
-                    continue
 
-        run.status = "completed"
-        run.completed_at = datetime.utcnow()
-        run.error_text = ""
-        db.commit()
-        db.refresh(run)
-        return run, research_items, plans, created_posts
-    except Exception as exc:
-        run.status = "failed"
-        run.error_text = str(exc)
-        run.completed_at = datetime.utcnow()
-        db.commit()
-        db.refresh(run)
-        raise
+            _set_run_stage(db, run, "generating")
+            try:
+                outputs = outputs_future.result()
+            except Exception:
+                for future in render_futures.values():
+                    future.cancel()
+                raise
+            created_posts = _insert_generated_posts(
+                db,
+                [
+                    {
+                        "user_id": user_id,
+                        "platform": platform,
+                        "input_content": content,
+                        "generated_text": text,
+                        "edited_text": "",
+                        "status": PostStatus.draft.value,
+                    }
+                    for platform, text in outputs.items()
+                ],
+                client.id if client else None,
+                job_status="draft",
+            )
+            if client:
+                _link_plans_to_client(db, user_id, client.id, plans)
+            db.commit()
+
+            if render_futures:
+                _set_run_stage(db, run, "rendering")
+                posts_by_platform: dict[str, GeneratedPost] = {}
+                for row in created_posts:
+                    posts_by_platform.setdefault(row.platform, row)
+                for platform, future in render_futures.items():
+                    post = posts_by_platform.get(platform)
+                    if not post:
+                        future.cancel()
+                        continue
+                    try:
+                        apply_plan_image(db, user_id, plans_by_platform[platform], future.result(), attach_post_id=post.id)
+                    except Exception:
+                        # Do not fail draft creation if visual generation has a provider/runtime issue.
+                        db.rollback()
+                        continue
+
+            run.status = "completed"
+            run.completed_at = datetime.utcnow()
+            run.error_text = ""
+            db.commit()
+            invalidate_user(user_id, POSTS, CLIENTS)
+            db.refresh(run)
+            return run, research_items, plans, created_posts
+        except Exception as exc:
+            db.rollback()
+            _fail_agent_run(db, run, str(exc))
+            db.refresh(run)
+            raise
+
+
+def _run_agent_workflow(
+    db: Session,
+    user_id: str,
+    payload: GenerateRequest,
+) -> tuple[AgentRun, list[ResearchItem], list[ContentPlan], list[GeneratedPost]]:
+    run = _start_agent_run(db, user_id, payload)
+    return _execute_agent_run(db, run, payload)
+
+
+def _run_agent_in_background(run_id: int, payload: GenerateRequest) -> None:
+    db = SessionLocal()
+    try:
+        run = db.get(AgentRun, run_id)
+        if run is None:
+            return
+        try:
+            _execute_agent_run(db, run, payload)
+        except Exception:
+            # _execute_agent_run already recorded the failure on the run row.
+            db.rollback()
+    finally:
+        db.close()
 
 
 @app.get("/api/dashboard/overview", response_model=DashboardOverviewResponse)
 def dashboard_overview(
+    request: Request,
     user_id: str = Depends(get_current_user_id),
     db: Session = Depends(get_db),
-) -> DashboardOverviewResponse:
-    _apply_payment_auto_pause(db, user_id)
-
-    total_clients = db.query(ClientProfile).filter(ClientProfile.user_id == user_id).count()
-    scheduled_posts = db.query(GeneratedPost).filter(
-        GeneratedPost.user_id == user_id,
-        GeneratedPost.status == PostStatus.scheduled.value,
-    ).count()
-    pending_approvals = db.query(ApprovalRequest).filter(
-        ApprovalRequest.user_id == user_id,
-        ApprovalRequest.status == "pending",
-    ).count()
-    metric_rows = db.query(ClientPerformanceMetric).filter(ClientPerformanceMetric.user_id == user_id).all()
-    engagement_total = sum(int(x.likes or 0) + int(x.shares or 0) + int(x.clicks or 0) + int(x.comments or 0) for x in metric_rows)
-    payment_rows = db.query(ClientPayment).filter(ClientPayment.user_id == user_id).all()
-    revenue_total = sum(float(x.amount or 0.0) for x in payment_rows if x.subscription_status == "active")
-
-    return DashboardOverviewResponse(
-        total_clients=total_clients,
-        scheduled_posts=scheduled_posts,
-        engagement_total=engagement_total,
-        revenue_total=round(revenue_total, 2),
-        pending_approvals=pending_approvals,
-    )
+) -> Response:
+    def build() -> DashboardOverviewResponse:
+        # One round trip: each KPI is a scalar subquery evaluated by the database.
+        total_clients = select(func.count(ClientProfile.id)).where(ClientProfile.user_id == user_id)
+        scheduled_posts = select(func.count(GeneratedPost.id)).where(
+            GeneratedPost.user_id == user_id,
+            GeneratedPost.status == PostStatus.scheduled.value,
+        )
+        pending_approvals = select(func.count(ApprovalRequest.id)).where(
+            ApprovalRequest.user_id == user_id,
+            ApprovalRequest.status == "pending",
+        )
+        engagement_total = select(
+            func.coalesce(
+                func.sum(
+                    func.coalesce(ClientPerformanceMetric.likes, 0)
+                    + func.coalesce(ClientPerformanceMetric.shares, 0)
+                    + func.coalesce(ClientPerformanceMetric.clicks, 0)
+                    + func.coalesce(ClientPerformanceMetric.comments, 0)
+                ),
+                0,
+            )
+        ).where(ClientPerformanceMetric.user_id == user_id)
+        revenue_total = select(func.coalesce(func.sum(ClientPayment.amount), 0.0)).where(
+            ClientPayment.user_id == user_id,
+            ClientPayment.subscription_status == "active",
+        )
+        total_clients, scheduled_posts, pending_approvals, engagement_total, revenue_total = db.execute(
+            select(
+                total_clients.scalar_subquery(),
+                scheduled_posts.scalar_subquery(),
+                pending_approvals.scalar_subquery(),
+                engagement_total.scalar_subquery(),
+                revenue_total.scalar_subquery(),
+            )
+        ).one()
+
+        return DashboardOverviewResponse(
+            total_clients=int(total_clients or 0),
+            scheduled_posts=int(scheduled_posts or 0),
+            engagement_total=int(engagement_total or 0),
+            revenue_total=round(float(revenue_total or 0.0), 2),
+            pending_approvals=pending_approvals,
+        )
+
+    return cached_json(request, user_id, (CLIENTS, POSTS, METRICS, PAYMENTS), build)
 
 
 @app.post("/api/content-calendar/generate", response_model=ContentCalendarGenerateResponse)
@@ -590,7 +779,7 @@ def generate_content_calendar(
     user_id: str = Depends(get_current_user_id),
     db: Session = Depends(get_db),
 ) -> ContentCalendarGenerateResponse:
-    _apply_payment_auto_pause(db, user_id)
+    apply_payment_auto_pause(db, user_id)
 
     client: ClientProfile | None = None
     if payload.client_id:
@@ -618,59 +807,56 @@ def generate_content_calendar(
     db.commit()
     db.refresh(run)
 
-    outputs = generate_platform_posts(
-        content=payload.content_seed,
-        platforms=platforms,
-        language_pref=payload.language_pref,
-        profile_context=f"Business={(client.business_name if client else '')}; Industry={(client.industry if client else '')}",
-    )
-    plans = create_content_plans(
-        db=db,
-        user_id=user_id,
-        run_id=run.id,
-        platforms=platforms,
-        language_pref=payload.language_pref,
-        timezone_name=settings.timezone,
-        research_items=[],
-        business_name=client.business_name if client else "",
-        niche=client.industry if client else "",
-        audience=client.target_audience if client else "",
-        tone=client.brand_voice if client else "",
-        region="",
-        posts_per_week=payload.days,
-    )
-
-    created_posts: list[GeneratedPost] = []
-    for plan in plans:
-        base_text = outputs.get(plan.platform, "")
-        text = f"{base_text}\n\nDaily focus: {plan.theme}".strip()
-        post = GeneratedPost(
+    with keep_loaded_on_commit(db):
+        outputs = generate_platform_posts(
+            content=payload.content_seed,
+            platforms=platforms,
+            language_pref=payload.language_pref,
+            profile_context=f"Business={(client.business_name if client else '')}; Industry={(client.industry if client else '')}",
+        )
+        plans = create_content_plans(
+            db=db,
             user_id=user_id,
-            platform=plan.platform,
-            input_content=payload.content_seed,
-            generated_text=text,
-            edited_text="",
-            status=PostStatus.scheduled.value,
-            scheduled_at=plan.planned_for,
+            run_id=run.id,
+            platforms=platforms,
+            language_pref=payload.language_pref,
+            timezone_name=settings.timezone,
+            research_items=[],
+            business_name=client.business_name if client else "",
+            niche=client.industry if client else "",
+            audience=client.target_audience if client else "",
+            tone=client.brand_voice if client else "",
+            region="",
+            posts_per_week=payload.days,
         )
-        db.add(post)
-        created_posts.append(post)
 
-    db.commit()
-    for post in created_posts:
-        db.refresh(post)
-        _ensure_approval_request(db, user_id, post.id)
-        _touch_publish_job(db, post, status="scheduled", scheduled_at=post.scheduled_at)
+        created_posts = _insert_generated_posts(
+            db,
+            [
+                {
+                    "user_id": user_id,
+                    "platform": plan.platform,
+                    "input_content": payload.content_seed,
+                    "generated_text": f"{outputs.get(plan.platform, '')}\n\nDaily focus: {plan.theme}".strip(),
+                    "edited_text": "",
+                    "status": PostStatus.scheduled.value,
+                    "scheduled_at": plan.planned_for,
+                }
+                for plan in plans
+            ],
+            client.id if client else None,
+            job_status="scheduled",
+        )
         if client:
-            _upsert_post_client_link(db, user_id, client.id, post.id)
-    if client:
-        for plan in plans:
-            _upsert_plan_client_link(db, user_id, client.id, plan.id)
+            _link_plans_to_client(db, user_id, client.id, plans)
 
-    run.status = "completed"
-    run.completed_at = datetime.utcnow()
-    run.error_text = ""
-    db.commit()
+        run.status = "completed"
+        run.completed_at = datetime.utcnow()
+        run.error_text = ""
+        db.commit()
+        invalidate_user(user_id, POSTS, CLIENTS)
+        for post in created_posts:
+            notify_schedule_change(post.scheduled_at)
 
     return ContentCalendarGenerateResponse(
         created_posts=len(created_posts),
@@ -681,26 +867,33 @@ def generate_content_calendar(
 
 @app.get("/api/analytics/overview", response_model=AnalyticsOverviewResponse)
 def analytics_overview(
+    request: Request,
     days: int = Query(default=14, ge=1, le=90),
     client_id: int | None = Query(default=None),
     user_id: str = Depends(get_current_user_id),
     db: Session = Depends(get_db),
-) -> AnalyticsOverviewResponse:
-    if client_id:
-        _ensure_client(db, user_id, client_id)
-    totals, series_rows = aggregate_metrics(db, user_id=user_id, days=days, client_id=client_id)
-    series = [AnalyticsPoint(**row) for row in series_rows]
-    return AnalyticsOverviewResponse(totals=totals, series=series)
+) -> Response:
+    def build() -> AnalyticsOverviewResponse:
+        if client_id:
+            _ensure_client(db, user_id, client_id)
+        totals, series_rows = aggregate_metrics(db, user_id=user_id, days=days, client_id=client_id)
+        series = [AnalyticsPoint(**row) for row in series_rows]
+        return AnalyticsOverviewResponse(totals=totals, series=series)
+
+    return cached_json(request, user_id, (METRICS, POSTS, CLIENTS), build)
 
 
 @app.get("/api/clients", response_model=list[ClientResponse])
 def list_clients(
+    request: Request,
     user_id: str = Depends(get_current_user_id),
     db: Session = Depends(get_db),
-) -> list[ClientResponse]:
-    _apply_payment_auto_pause(db, user_id)
-    rows = db.query(ClientProfile).filter(ClientProfile.user_id == user_id).order_by(ClientProfile.created_at.desc()).all()
-    return [_serialize_client(db, user_id, row) for row in rows]
+) -> Response:
+    def build() -> list[ClientResponse]:
+        rows = db.query(ClientProfile).filter(ClientProfile.user_id == user_id).order_by(ClientProfile.created_at.desc()).all()
+        return _serialize_clients(db, user_id, rows)
+
+    return cached_json(request, user_id, (CLIENTS, POSTS, METRICS, SOCIAL, PAYMENTS), build)
 
 
 @app.post("/api/clients", response_model=ClientResponse)
@@ -726,8 +919,11 @@ def create_client(
         service_paused=False,
     )
     db.add(row)
+    db.flush()
+    _sync_onboarding_status(db, user_id, [row])
     db.commit()
     db.refresh(row)
+    invalidate_user(user_id, CLIENTS)
     return _serialize_client(db, user_id, row)
 
 
@@ -746,8 +942,10 @@ def update_client(
         else:
             setattr(row, key, value)
     row.updated_at = datetime.utcnow()
+    _sync_onboarding_status(db, user_id, [row])
     db.commit()
     db.refresh(row)
+    invalidate_user(user_id, CLIENTS)
     return _serialize_client(db, user_id, row)
 
 
@@ -773,17 +971,21 @@ def complete_client_onboarding(
     row.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(row)
+    invalidate_user(user_id, CLIENTS)
     return ClientOnboardingActionResponse(client=_serialize_client(db, user_id, row), onboarding=onboarding)
 
 
 @app.get("/api/payments", response_model=list[PaymentResponse])
 def list_payments(
+    request: Request,
     user_id: str = Depends(get_current_user_id),
     db: Session = Depends(get_db),
-) -> list[PaymentResponse]:
-    _apply_payment_auto_pause(db, user_id)
-    rows = db.query(ClientPayment).filter(ClientPayment.user_id == user_id).order_by(ClientPayment.created_at.desc()).all()
-    return [_serialize_payment(db, row) for row in rows]
+) -> Response:
+    def build() -> list[PaymentResponse]:
+        rows = db.query(ClientPayment).filter(ClientPayment.user_id == user_id).order_by(ClientPayment.created_at.desc()).all()
+        return [_serialize_payment(db, row) for row in rows]
+
+    return cached_json(request, user_id, (PAYMENTS, CLIENTS), build)
 
 
 @app.post("/api/payments", response_model=PaymentResponse)
@@ -806,7 +1008,8 @@ def create_payment(
     )
     db.add(row)
     db.commit()
-    _apply_payment_auto_pause(db, user_id)
+    invalidate_user(user_id, PAYMENTS, CLIENTS)
+    apply_payment_auto_pause(db, user_id)
     db.refresh(row)
     return _serialize_payment(db, row)
 
@@ -830,7 +1033,8 @@ def update_payment(
             setattr(row, key, value)
     row.updated_at = datetime.utcnow()
     db.commit()
-    _apply_payment_auto_pause(db, user_id)
+    invalidate_user(user_id, PAYMENTS, CLIENTS)
+    apply_payment_auto_pause(db, user_id)
     db.refresh(row)
     return _serialize_payment(db, row)
 
@@ -846,32 +1050,109 @@ def generate_content(
 
 
 @app.post("/api/agent/run", response_model=AgentRunResponse)
-def agent_run(
+async def agent_run(
     payload: GenerateRequest,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> AgentRunResponse:
-    run, research_items, plans, created = _run_agent_workflow(db=db, user_id=user_id, payload=payload)
+    run = await db.run_sync(_start_agent_run, user_id, payload)
+    try:
+        agent_executor.submit(_run_agent_in_background, run.id, payload)
+    except Exception as exc:
+        # The run is already stored as queued; without this it would never leave that state.
+        await db.run_sync(_fail_agent_run, run, f"Could not start agent run: {exc}")
+        raise HTTPException(status_code=503, detail="Agent runner is unavailable, please retry shortly") from exc
     return AgentRunResponse(
         run_id=run.id,
-        drafts=[_serialize_post(x) for x in created],
-        research_items=[_serialize_research(x) for x in research_items],
-        content_plans=[_serialize_plan(x) for x in plans],
+        status=run.status,
+        drafts=[],
+        research_items=[],
+        content_plans=[],
     )
 
 
+@app.get("/api/agent/runs/{run_id}", response_model=AgentRunStatusResponse)
+async def get_agent_run_status(
+    run_id: int,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db),
+) -> AgentRunStatusResponse:
+    run = await db.scalar(select(AgentRun).where(AgentRun.id == run_id, AgentRun.user_id == user_id))
+    if not run:
+        raise HTTPException(status_code=404, detail="Agent run not found")
+    return AgentRunStatusResponse(
+        run_id=run.id,
+        status=run.status,
+        error_text=run.error_text,
+        created_at=run.created_at,
+        completed_at=run.completed_at,
+    )
+
+
+def _encode_drafts_cursor(post: GeneratedPost) -> str:
+    raw = f"{post.created_at.isoformat()}|{post.id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_drafts_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, post_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
 @app.get("/api/drafts", response_model=HistoryResponse)
 def get_drafts(
+    request: Request,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+    platform: str | None = Query(default=None),
+    client_id: int | None = Query(default=None),
+    scheduled_before: datetime | None = Query(default=None),
+    include_input: bool = Query(default=True),
+    text_limit: int = Query(default=0, ge=0, le=20000),
     user_id: str = Depends(get_current_user_id),
     db: Session = Depends(get_db),
-) -> HistoryResponse:
-    rows = (
-        db.query(GeneratedPost)
-        .filter(GeneratedPost.user_id == user_id)
-        .order_by(GeneratedPost.created_at.desc())
-        .all()
-    )
-    return HistoryResponse(posts=[_serialize_post(r) for r in rows])
+) -> Response:
+    def build() -> HistoryResponse:
+        query = db.query(GeneratedPost).filter(GeneratedPost.user_id == user_id)
+        if status:
+            query = query.filter(GeneratedPost.status == status)
+        if scheduled_before:
+            if scheduled_before.tzinfo:
+                scheduled_before_utc = scheduled_before.astimezone(ZoneInfo("UTC")).replace(tzinfo=None)
+            else:
+                scheduled_before_utc = scheduled_before
+            query = query.filter(GeneratedPost.scheduled_at < scheduled_before_utc)
+        if platform:
+            query = query.filter(GeneratedPost.platform == platform)
+        if client_id:
+            query = query.join(PostClientLink, PostClientLink.post_id == GeneratedPost.id).filter(
+                PostClientLink.user_id == user_id,
+                PostClientLink.client_id == client_id,
+            )
+        if cursor:
+            cursor_at, cursor_id = _decode_drafts_cursor(cursor)
+            query = query.filter(
+                or_(
+                    GeneratedPost.created_at < cursor_at,
+                    and_(GeneratedPost.created_at == cursor_at, GeneratedPost.id < cursor_id),
+                )
+            )
+        if not include_input:
+            query = query.options(defer(GeneratedPost.input_content))
+
+        rows = query.order_by(GeneratedPost.created_at.desc(), GeneratedPost.id.desc()).limit(limit + 1).all()
+        next_cursor = _encode_drafts_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return HistoryResponse(
+            posts=[_serialize_post(r, include_input=include_input, text_limit=text_limit) for r in rows[:limit]],
+            next_cursor=next_cursor,
+        )
+
+    return cached_json(request, user_id, (POSTS,), build)
 
 
 @app.get("/api/research", response_model=list[ResearchItemResponse])
@@ -905,38 +1186,45 @@ def get_content_plans(
 
 
 @app.post("/api/content-plans/{plan_id}/generate-image", response_model=ContentPlanResponse)
-def generate_content_plan_image(
+async def generate_content_plan_image(
     plan_id: int,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> ContentPlanResponse:
-    plan = db.query(ContentPlan).filter(ContentPlan.id == plan_id, ContentPlan.user_id == user_id).first()
+    plan = await db.scalar(select(ContentPlan).where(ContentPlan.id == plan_id, ContentPlan.user_id == user_id))
     if not plan:
         raise HTTPException(status_code=404, detail="Content plan not found")
 
-    run = db.query(AgentRun).filter(AgentRun.id == plan.run_id, AgentRun.user_id == user_id).first()
-    business_name = run.business_name if run else ""
-    source_text = run.source_content if run else ""
-    draft_for_platform = (
-        db.query(GeneratedPost)
-        .filter(
+    run = await db.scalar(select(AgentRun).where(AgentRun.id == plan.run_id, AgentRun.user_id == user_id))
+    draft_id = await db.scalar(
+        select(GeneratedPost.id)
+        .where(
             GeneratedPost.user_id == user_id,
             GeneratedPost.platform == plan.platform,
             GeneratedPost.status != PostStatus.posted.value,
         )
         .order_by(GeneratedPost.created_at.desc())
-        .first()
+        .limit(1)
     )
+    # Rendering takes seconds to minutes; end the read transaction so no pooled connection is held across it.
+    await db.commit()
     try:
-        updated = generate_plan_image(
-            db=db,
-            user_id=user_id,
-            plan_id=plan_id,
-            business_name=business_name,
-            source_text=source_text,
-            attach_post_id=draft_for_platform.id if draft_for_platform else None,
-            strict_ai=True,
+        # Rendering drives the image SDKs synchronously, so it runs on the stage pool rather than Starlette's.
+        rendered = await asyncio.get_running_loop().run_in_executor(
+            agent_stage_executor,
+            lambda: render_plan_image(
+                user_id=user_id,
+                plan_id=plan.id,
+                platform=plan.platform,
+                theme=plan.theme,
+                post_angle=plan.post_angle,
+                image_prompt=plan.image_prompt,
+                business_name=run.business_name if run else "",
+                source_text=run.source_content if run else "",
+                strict_ai=True,
+            ),
         )
+        updated = await db.run_sync(apply_plan_image, user_id, plan, rendered, attach_post_id=draft_id)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Image generation failed: {exc}") from exc
     return _serialize_plan(updated)
@@ -986,6 +1274,7 @@ def update_post(
     post.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(post)
+    invalidate_user(user_id, POSTS)
     return _serialize_post(post)
 
 
@@ -1024,6 +1313,7 @@ def update_status(
         approval.resolution_note = ""
     db.commit()
     db.refresh(post)
+    invalidate_user(user_id, POSTS)
     return _serialize_post(post)
 
 
@@ -1046,22 +1336,24 @@ def schedule_post(
     _touch_publish_job(db, post, status="scheduled", scheduled_at=post.scheduled_at)
     db.commit()
     db.refresh(post)
+    invalidate_user(user_id, POSTS, CLIENTS)
+    notify_schedule_change(post.scheduled_at)
     return _serialize_post(post)
 
 
 @app.post("/api/posts/{post_id}/publish", response_model=DraftPost)
-def publish_post_now(
+async def publish_post_now(
     post_id: int,
     payload: PublishNowRequest,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> DraftPost:
     if not payload.confirm:
         raise HTTPException(status_code=400, detail="Explicit permission required")
 
-    _assert_post_client_active(db, user_id, post_id)
+    await db.run_sync(_assert_post_client_active, user_id, post_id)
 
-    post = db.query(GeneratedPost).filter(GeneratedPost.id == post_id, GeneratedPost.user_id == user_id).first()
+    post = await db.scalar(select(GeneratedPost).where(GeneratedPost.id == post_id, GeneratedPost.user_id == user_id))
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
@@ -1071,59 +1363,112 @@ def publish_post_now(
     if post.status not in [PostStatus.approved.value, PostStatus.scheduled.value, PostStatus.failed.value]:
         raise HTTPException(status_code=400, detail="Post must be approved or scheduled before publishing")
 
-    content = post.edited_text.strip() if post.edited_text.strip() else post.generated_text
     if post.platform == "twitter":
-        _touch_publish_job(
-            db,
+        await db.run_sync(
+            _touch_publish_job,
             post,
             status="failed",
             error_message="Twitter free mode requires manual publish",
             attempted=True,
         )
-        db.commit()
+        await db.commit()
+        invalidate_user(user_id, POSTS, METRICS, CLIENTS)
         raise HTTPException(
             status_code=400,
             detail="Twitter is on free mode. Use manual publish from the dashboard.",
         )
 
+    # Same compare-and-set lease the scheduler claims with, so a manual and a scheduled publish never both send.
+    lease_owner = f"api:{uuid.uuid4().hex}"
+    if not await db.run_sync(claim_publish_lease, post_id, lease_owner):
+        raise HTTPException(status_code=409, detail="Post is already being published")
     try:
-        media = list_post_media(db, user_id, post.id)
-        refresh_media_signed_urls(db, media)
-        if post.platform == "linkedin" and not media:
-            raise RuntimeError("Attach or generate at least one image before LinkedIn publish")
-        if post.platform == "instagram" and not any(x.mime_type.startswith("image/") for x in media):
-            raise RuntimeError("Instagram publish requires at least one image")
-        if post.platform == "linkedin":
-            result = publish_to_linkedin(db, user_id, content, media_items=media)
-        elif post.platform == "instagram":
-            result = publish_to_instagram(db, user_id, content, media_items=media)
-        elif post.platform == "facebook":
-            result = publish_to_facebook(db, user_id, content, media_items=media)
-        else:
-            raise RuntimeError("Unsupported automatic publish platform")
-        post.status = PostStatus.posted.value
-        post.posted_at = datetime.utcnow()
-        post.external_post_id = result.get("external_post_id", "")
-        post.last_error = ""
-        _touch_publish_job(db, post, status="posted", attempted=True, completed=True, error_message="")
-        record_publish_metric(
-            db,
-            user_id=user_id,
-            post_id=post.id,
-            platform=post.platform,
-            posted_at=post.posted_at,
-        )
-    except Exception as exc:
-        post.status = PostStatus.failed.value
-        post.last_error = str(exc)
-        _touch_publish_job(db, post, status="failed", attempted=True, error_message=str(exc))
-        db.commit()
-        db.refresh(post)
-        raise HTTPException(status_code=500, detail=f"Publish failed: {exc}") from exc
-
-    db.commit()
-    db.refresh(post)
-    return _serialize_post(post)
+        await db.refresh(post)
+        if post.status not in [PostStatus.approved.value, PostStatus.scheduled.value, PostStatus.failed.value]:
+            raise HTTPException(status_code=409, detail=f"Post is already {post.status}")
+        content = post.edited_text.strip() if post.edited_text.strip() else post.generated_text
+
+        try:
+            media = await db.run_sync(list_post_media, user_id, post.id)
+            if post.platform == "linkedin" and not media:
+                raise PermanentPublishError("Attach or generate at least one image before LinkedIn publish")
+            if post.platform == "instagram" and not any(x.mime_type.startswith("image/") for x in media):
+                raise PermanentPublishError("Instagram publish requires at least one image")
+
+            # Provider calls can take seconds, so reads are committed first and no pooled connection is held
+            # across them.
+            await db.commit()
+
+            async def _send() -> dict:
+                await refresh_media_signed_urls_async(db, media)
+                if post.platform == "linkedin":
+                    return await publish_to_linkedin_async(db, user_id, content, media_items=media)
+                if post.platform == "instagram":
+                    return await publish_to_instagram_async(db, user_id, content, media_items=media)
+                if post.platform == "facebook":
+                    return await publish_to_facebook_async(db, user_id, content, media_items=media)
+                raise PermanentPublishError("Unsupported automatic publish platform")
+
+            result = await breaker_for(post.platform).acall(_send)
+        except CircuitOpenError as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        except Exception as exc:
+            if not is_transient(exc):
+                # Not a provider outage (disconnected account, rejected input, ...): the post keeps its status
+                # so the user can fix the cause and publish again.
+                post.last_error = str(exc)
+                await db.run_sync(_touch_publish_job, post, status="failed", attempted=True, error_message=str(exc))
+                await db.commit()
+                invalidate_user(user_id, POSTS, METRICS, CLIENTS)
+                status_code = 400 if isinstance(exc, PermanentPublishError) else 502
+                raise HTTPException(status_code=status_code, detail=f"Publish failed: {exc}") from exc
+
+            job = await db.run_sync(_touch_publish_job, post, status="retrying", attempted=True, error_message=str(exc))
+            retry_at = schedule_retry(job)
+            if retry_at is None:
+                post.status = PostStatus.failed.value
+                post.last_error = str(exc)
+                job.status = "failed"
+                detail = f"Publish failed: {exc}"
+            else:
+                # Hand the post to the scheduler's retry queue instead of failing it for good.
+                post.status = PostStatus.scheduled.value
+                post.scheduled_at = datetime.utcnow()
+                post.last_error = f"{exc} (retry {job.attempt_count}/{settings.publish_max_attempts} at {retry_at:%Y-%m-%d %H:%M:%S} UTC)"
+                detail = f"Publish failed: {exc}. Automatic retry queued for {retry_at:%Y-%m-%d %H:%M:%S} UTC."
+            await db.commit()
+            invalidate_user(user_id, POSTS, METRICS, CLIENTS)
+            notify_schedule_change(retry_at)
+            raise HTTPException(status_code=503, detail=detail) from exc
+
+        # The post is live from here on; a bookkeeping failure must not leave it publishable a second time.
+        external_post_id = result.get("external_post_id", "")
+        try:
+            post.status = PostStatus.posted.value
+            post.posted_at = datetime.utcnow()
+            post.external_post_id = external_post_id
+            post.last_error = ""
+            await db.run_sync(_touch_publish_job, post, status="posted", attempted=True, completed=True, error_message="")
+            await db.run_sync(
+                record_publish_metric,
+                user_id=user_id,
+                post_id=post.id,
+                platform=post.platform,
+                posted_at=post.posted_at,
+            )
+            await db.commit()
+        except Exception as exc:
+            await db.rollback()
+            await db.run_sync(mark_post_sent, post_id, external_post_id, exc)
+            await db.commit()
+        await db.refresh(post)
+        invalidate_user(user_id, POSTS, METRICS, CLIENTS)
+        return _serialize_post(post)
+    finally:
+        # Anything left uncommitted by a failed write is dropped so the release itself can go through.
+        await db.rollback()
+        await db.run_sync(release_publish_lease, post_id, lease_owner)
+        await db.commit()
 
 
 @app.post("/api/posts/{post_id}/request-approval")
@@ -1139,6 +1484,7 @@ def request_post_approval(
         result = request_whatsapp_approval(db=db, post=post)
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"WhatsApp approval failed: {exc}") from exc
+    invalidate_user(user_id, POSTS)
     sent_to = int(result.get("sent_to", 0))
     failed_count = int(result.get("failed_count", 0))
     message = f"Approval request sent to {sent_to} recipient(s)"
@@ -1215,6 +1561,7 @@ def manual_publish_post(
     )
     db.commit()
     db.refresh(post)
+    invalidate_user(user_id, POSTS, METRICS, CLIENTS)
     return _serialize_post(post)
 
 
@@ -1251,62 +1598,66 @@ def list_media(
 
 @app.get("/api/social-accounts", response_model=list[SocialAccountResponse])
 def social_accounts(
+    request: Request,
     user_id: str = Depends(get_current_user_id),
     db: Session = Depends(get_db),
-) -> list[SocialAccountResponse]:
-    linkedin = (
-        db.query(SocialAccount)
-        .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "linkedin")
-        .first()
-    )
-    instagram = (
-        db.query(SocialAccount)
-        .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "instagram")
-        .first()
-    )
-    twitter = (
-        db.query(SocialAccount)
-        .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "twitter")
-        .first()
-    )
-    canva = (
-        db.query(SocialAccount)
-        .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "canva")
-        .first()
-    )
-    facebook = (
-        db.query(SocialAccount)
-        .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "facebook")
-        .first()
-    )
+) -> Response:
+    def build() -> list[SocialAccountResponse]:
+        linkedin = (
+            db.query(SocialAccount)
+            .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "linkedin")
+            .first()
+        )
+        instagram = (
+            db.query(SocialAccount)
+            .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "instagram")
+            .first()
+        )
+        twitter = (
+            db.query(SocialAccount)
+            .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "twitter")
+            .first()
+        )
+        canva = (
+            db.query(SocialAccount)
+            .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "canva")
+            .first()
+        )
+        facebook = (
+            db.query(SocialAccount)
+            .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "facebook")
+            .first()
+        )
 
-    return [
-        SocialAccountResponse(
-            platform="linkedin",
-            connected=linkedin is not None,
-            account_name=linkedin.account_name if linkedin else None,
-        ),
-        SocialAccountResponse(
-            platform="instagram",
-            connected=instagram is not None,
-            account_name=instagram.account_name if instagram else None,
-        ),
-        SocialAccountResponse(
-            platform="twitter",
-            connected=twitter is not None,
-            account_name=twitter.account_name if twitter else None,
-        ),
-        SocialAccountResponse(
-            platform="canva",
-            connected=canva is not None,
-            account_name=canva.account_name if canva else None,
-        ),
-        SocialAccountResponse(
-            platform="facebook",
-            connected=facebook is not None,
-            account_name=facebook.account_name if facebook else None,
-        ),
-    ]
+        return [
+            SocialAccountResponse(
+                platform="linkedin",
+                connected=linkedin is not None,
+                account_name=linkedin.account_name if linkedin else None,
+            ),
+            SocialAccountResponse(
+                platform="instagram",
+                connected=instagram is not None,
+                account_name=instagram.account_name if instagram else None,
+            ),
+            SocialAccountResponse(
+                platform="twitter",
+                connected=twitter is not None,
+                account_name=twitter.account_name if twitter else None,
+            ),
+            SocialAccountResponse(
+                platform="canva",
+                connected=canva is not None,
+                account_name=canva.account_name if canva else None,
+            ),
+            SocialAccountResponse(
+                platform="facebook",
+                connected=facebook is not None,
+                account_name=facebook.account_name if facebook else None,
+            ),
+        ]
+
+    return cached_json(request, user_id, (SOCIAL,), build)
 
 
 @app.get("/api/linkedin/connect/start", response_model=LinkedInConnectStartResponse)
@@ -1334,6 +1685,9 @@ def facebook_connect_start(
 ) -> LinkedInConnectStartResponse:
     try:
         connect_facebook_from_settings(db, user_id)
+        _sync_onboarding_status(db, user_id)
+        db.commit()
+        invalidate_user(user_id, CLIENTS)
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"Facebook connect failed: {exc}") from exc
     redirect_base = settings.frontend_url.rstrip("/") if settings.frontend_url else ""
@@ -1348,6 +1702,9 @@ def instagram_connect_start(
 ) -> LinkedInConnectStartResponse:
     try:
         connect_instagram_from_settings(db, user_id)
+        _sync_onboarding_status(db, user_id)
+        db.commit()
+        invalidate_user(user_id, CLIENTS)
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"Instagram connect failed: {exc}") from exc
     redirect_base = settings.frontend_url.rstrip("/") if settings.frontend_url else ""
@@ -1386,7 +1743,10 @@ def linkedin_connect_callback(
         return RedirectResponse(url=error_url)
 
     try:
-        handle_linkedin_callback(db, code, state)
+        connected_user_id = handle_linkedin_callback(db, code, state)
+        _sync_onboarding_status(db, connected_user_id)
+        db.commit()
+        invalidate_user(connected_user_id, CLIENTS)
     except Exception as exc:
         error_url = f"{redirect_base}/index.html?linkedin=error&message={str(exc)}" if redirect_base else f"/index.html?linkedin=error&message={str(exc)}"
         return RedirectResponse(url=error_url)
@@ -1,10 +1,13 @@
+import asyncio
 import base64
 from datetime import datetime
 from pathlib import Path
 
-import requests
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from backend import http_client
+from backend.http_client import RequestFlow
 from backend.db_models import GeneratedPost, MediaAsset
 from config.settings import settings
 
@@ -32,11 +35,11 @@ def _supabase_headers(content_type: str | None = None) -> dict[str, str]:
 def _ensure_bucket() -> None:
     bucket = settings.supabase_storage_bucket
     url = f"{settings.supabase_url}/storage/v1/bucket/{bucket}"
-    r = requests.get(url, headers=_supabase_headers(), timeout=30)
+    r = http_client.get(url, headers=_supabase_headers(), timeout=30)
     if r.status_code == 200:
         return
 
-    create = requests.post(
+    create = http_client.post(
         f"{settings.supabase_url}/storage/v1/bucket",
         headers=_supabase_headers("application/json"),
         json={"id": bucket, "name": bucket, "public": False},
@@ -46,14 +49,15 @@ def _ensure_bucket() -> None:
         raise RuntimeError(f"Failed to create storage bucket: {create.status_code} {create.text[:200]}")
 
 
-def _generate_signed_url(storage_path: str, expires_in: int = 3600) -> str:
+def _signed_url_flow(storage_path: str, expires_in: int = 3600) -> RequestFlow[str]:
     bucket = settings.supabase_storage_bucket
-    sign = requests.post(
-        f"{settings.supabase_url}/storage/v1/object/sign/{bucket}/{storage_path}",
-        headers=_supabase_headers("application/json"),
-        json={"expiresIn": expires_in},
-        timeout=30,
-    )
+    sign = yield {
+        "method": "POST",
+        "url": f"{settings.supabase_url}/storage/v1/object/sign/{bucket}/{storage_path}",
+        "headers": _supabase_headers("application/json"),
+        "json": {"expiresIn": expires_in},
+        "timeout": 30,
+    }
     sign.raise_for_status()
     signed = sign.json().get("signedURL", "")
     if not signed:
@@ -61,6 +65,10 @@ def _generate_signed_url(storage_path: str, expires_in: int = 3600) -> str:
     return f"{settings.supabase_url}/storage/v1{signed}"
 
 
+def _generate_signed_url(storage_path: str, expires_in: int = 3600) -> str:
+    return http_client.run_flow(_signed_url_flow(storage_path, expires_in))
+
+
 def upload_media_base64(db: Session, user_id: str, post_id: int, file_name: str, mime_type: str, content_base64: str) -> MediaAsset:
     if mime_type not in ALLOWED_MIME_TYPES:
         raise RuntimeError("Only PNG, JPG/JPEG, and PDF are allowed")
@@ -83,7 +91,7 @@ def upload_media_base64(db: Session, user_id: str, post_id: int, file_name: str,
 
     _ensure_bucket()
 
-    upload = requests.post(
+    upload = http_client.post(
         f"{settings.supabase_url}/storage/v1/object/{settings.supabase_storage_bucket}/{storage_path}",
         headers={**_supabase_headers(mime_type), "x-upsert": "true"},
         data=file_bytes,
@@ -121,22 +129,36 @@ def list_post_media(db: Session, user_id: str, post_id: int) -> list[MediaAsset]
     )
 
 
-def refresh_media_signed_urls(db: Session, media_items: list[MediaAsset]) -> None:
+def _apply_signed_urls(media_items: list[MediaAsset], urls: list[str]) -> bool:
     changed = False
-    for item in media_items:
-        url = _generate_signed_url(item.storage_path)
+    for item, url in zip(media_items, urls):
         if url and url != item.file_url:
             item.file_url = url
             changed = True
-    if changed:
+    return changed
+
+
+def refresh_media_signed_urls(db: Session, media_items: list[MediaAsset]) -> None:
+    if _apply_signed_urls(media_items, [_generate_signed_url(item.storage_path) for item in media_items]):
         db.commit()
 
 
-def download_media_bytes(storage_path: str) -> bytes:
-    r = requests.get(
-        f"{settings.supabase_url}/storage/v1/object/{settings.supabase_storage_bucket}/{storage_path}",
-        headers=_supabase_headers(),
-        timeout=60,
-    )
+async def refresh_media_signed_urls_async(db: AsyncSession, media_items: list[MediaAsset]) -> None:
+    urls = await asyncio.gather(*(http_client.arun_flow(_signed_url_flow(item.storage_path)) for item in media_items))
+    if _apply_signed_urls(media_items, list(urls)):
+        await db.commit()
+
+
+def download_media_flow(storage_path: str) -> RequestFlow[bytes]:
+    r = yield {
+        "method": "GET",
+        "url": f"{settings.supabase_url}/storage/v1/object/{settings.supabase_storage_bucket}/{storage_path}",
+        "headers": _supabase_headers(),
+        "timeout": 60,
+    }
     r.raise_for_status()
-    return r.content
\ No newline at end of file
+    return r.content
+
+
+def download_media_bytes(storage_path: str) -> bytes:
+    return http_client.run_flow(download_media_flow(storage_path))
\ No newline at end of file
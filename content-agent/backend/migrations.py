@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+# Append-only: each step runs once per database, in version order, and is recorded in schema_migrations.
+# Steps must be idempotent so databases bootstrapped from supabase_schema.sql (or a fresh create_all)
+# can adopt the ledger without failing on objects that already exist.
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def _add_columns(table: str, columns: dict[str, dict[str, str]]) -> Callable[[Connection], None]:
+    """``columns`` maps column name to its DDL type per dialect ("default" is used when a dialect is absent)."""
+
+    def apply(conn: Connection) -> None:
+        existing = {column["name"] for column in inspect(conn).get_columns(table)}
+        dialect = conn.dialect.name
+        for name, types in columns.items():
+            if name not in existing:
+                conn.execute(text(f"alter table {table} add column {name} {types.get(dialect, types['default'])}"))
+
+    return apply
+
+
+def _statements(*sql: str) -> Callable[[Connection], None]:
+    def apply(conn: Connection) -> None:
+        for statement in sql:
+            conn.execute(text(statement))
+
+    return apply
+
+
+def _publish_lease_and_retry_columns(conn: Connection) -> None:
+    _add_columns(
+        "generated_posts",
+        {
+            "lease_owner": {"default": "varchar(128) default ''", "postgresql": "text default ''"},
+            "lease_expires_at": {"default": "datetime null", "postgresql": "timestamptz null"},
+        },
+    )(conn)
+    _add_columns(
+        "publish_jobs",
+        {
+            "attempt_count": {"default": "integer default 0"},
+            "next_attempt_at": {"default": "datetime null", "postgresql": "timestamptz null"},
+        },
+    )(conn)
+    conn.execute(text("create index if not exists idx_publish_jobs_next_attempt on publish_jobs(next_attempt_at)"))
+
+
+_SAME_METRIC_DAY = (
+    "where d.user_id = client_performance_metrics.user_id and d.client_id = client_performance_metrics.client_id"
+    " and d.platform = client_performance_metrics.platform and d.metric_date = client_performance_metrics.metric_date"
+)
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "publish_lease_and_retry_columns", _publish_lease_and_retry_columns),
+    Migration(
+        2,
+        "drafts_keyset_indexes",
+        _statements(
+            "create index if not exists idx_generated_posts_user_created on generated_posts(user_id, created_at, id)",
+            "create index if not exists idx_generated_posts_user_status_created"
+            " on generated_posts(user_id, status, created_at, id)",
+            "create index if not exists idx_generated_posts_user_platform_created"
+            " on generated_posts(user_id, platform, created_at, id)",
+            "create index if not exists idx_post_client_links_client_post on post_client_links(client_id, post_id)",
+        ),
+    ),
+    Migration(
+        3,
+        "hot_query_composite_indexes",
+        _statements(
+            "create index if not exists idx_generated_posts_scheduled_due"
+            " on generated_posts(scheduled_at, id) where status = 'scheduled'",
+            "create index if not exists idx_publish_jobs_user_post on publish_jobs(user_id, post_id)",
+            "create index if not exists idx_publish_jobs_post_next_attempt on publish_jobs(post_id, next_attempt_at)",
+            "create index if not exists idx_approval_requests_user_post on approval_requests(user_id, post_id)",
+            "create index if not exists idx_media_assets_user_post on media_assets(user_id, post_id)",
+            "create index if not exists idx_client_perf_user_client_date"
+            " on client_performance_metrics(user_id, client_id, metric_date)",
+            "create index if not exists idx_client_perf_user_date on client_performance_metrics(user_id, metric_date)",
+        ),
+    ),
+    Migration(
+        4,
+        "drop_duplicate_next_attempt_index",
+        # create_all used to add ix_publish_jobs_next_attempt_at next to migration 1's idx_publish_jobs_next_attempt.
+        _statements("drop index if exists ix_publish_jobs_next_attempt_at"),
+    ),
+    Migration(
+        5,
+        "client_perf_daily_unique",
+        # Concurrent publishers could each insert the day's row; fold duplicates into the oldest before enforcing it.
+        _statements(
+            "update client_performance_metrics set"
+            + ",".join(
+                f" {column} = (select sum(d.{column}) from client_performance_metrics d {_SAME_METRIC_DAY})"
+                for column in ("likes", "shares", "comments", "clicks", "follower_growth")
+            )
+            + " where id in (select min(id) from client_performance_metrics"
+            " group by user_id, client_id, platform, metric_date having count(*) > 1)",
+            "delete from client_performance_metrics where id not in (select min(id) from client_performance_metrics"
+            " group by user_id, client_id, platform, metric_date)",
+            "create unique index if not exists uq_client_perf_daily"
+            " on client_performance_metrics(user_id, client_id, platform, metric_date)",
+        ),
+    ),
+]
+
+
+def _ensure_ledger(conn: Connection) -> None:
+    conn.execute(
+        text(
+            "create table if not exists schema_migrations ("
+            "version integer primary key, name varchar(128) not null, applied_at timestamp not null)"
+        )
+    )
+
+
+def _lock(conn: Connection) -> None:
+    # Several API workers may boot at once; on Postgres only one gets to migrate, the rest wait and then no-op.
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("select pg_advisory_xact_lock(hashtext('content_agent_schema_migrations'))"))
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    """Apply pending migrations in order, each in its own transaction; returns the versions applied."""
+    applied: list[int] = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        with engine.begin() as conn:
+            _ensure_ledger(conn)
+            _lock(conn)
+            done = conn.execute(
+                text("select 1 from schema_migrations where version = :version"), {"version": migration.version}
+            ).first()
+            if done:
+                continue
+            migration.apply(conn)
+            conn.execute(
+                text("insert into schema_migrations (version, name, applied_at) values (:version, :name, :applied_at)"),
+                {"version": migration.version, "name": migration.name, "applied_at": datetime.utcnow()},
+            )
+            applied.append(migration.version)
+    return applied
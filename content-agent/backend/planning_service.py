@@ -6,6 +6,7 @@ from zoneinfo import ZoneInfo
 
 from sqlalchemy.orm import Session
 
+from backend.bulk import insert_returning
 from backend.db_models import ContentPlan, ResearchItem
 
 DEFAULT_POSTS_PER_WEEK = 3
@@ -93,7 +94,7 @@ def create_content_plans(
     audience_text = (audience or "target audience").strip()
     tone_text = (tone or "professional").strip()
     region_text = (region or "global").strip()
-    plans: list[ContentPlan] = []
+    rows: list[dict] = []
 
     for platform in platforms:
         hour, minute = PLATFORM_TIMES.get(platform, (12, 0))
@@ -110,22 +111,21 @@ def create_content_plans(
                 f"Tone: {tone_text}. Region context: {region_text}. "
                 f"Style: {style_hint}. Avoid logos from other brands."
             )
-            row = ContentPlan(
-                user_id=user_id,
-                run_id=run_id,
-                platform=platform,
-                language_pref=language_pref,
-                planned_for=utc_slot,
-                status="planned",
-                theme=theme,
-                post_angle=f"{platform} angle #{idx + 1}: {angle}",
-                image_prompt=image_prompt,
-                image_url="",
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "run_id": run_id,
+                    "platform": platform,
+                    "language_pref": language_pref,
+                    "planned_for": utc_slot,
+                    "status": "planned",
+                    "theme": theme,
+                    "post_angle": f"{platform} angle #{idx + 1}: {angle}",
+                    "image_prompt": image_prompt,
+                    "image_url": "",
+                }
             )
-            db.add(row)
-            plans.append(row)
 
+    plans = insert_returning(db, ContentPlan, rows)
     db.commit()
-    for row in plans:
-        db.refresh(row)
     return plans
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import requests
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from backend.db_models import GeneratedPost, PostStatus, PublishJob
+from config.settings import settings
+
+
+class PermanentPublishError(RuntimeError):
+    """A publish failure that retrying cannot fix (bad input, missing media or account, paused client, provider 4xx)."""
+
+
+class ProviderUnavailableError(RuntimeError):
+    """The provider answered 429 or 5xx: worth retrying later, and counted against its circuit."""
+
+
+def raise_for_provider_status(response, what: str, limit: int = 300) -> None:
+    """Raise for an error response: 429/5xx are transient, any other 4xx is permanent for this post."""
+    if response.status_code < 400:
+        return
+    message = f"{what}: {response.status_code} {response.text[:limit]}"
+    if response.status_code == 429 or response.status_code >= 500:
+        raise ProviderUnavailableError(message)
+    raise PermanentPublishError(message)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Transport errors and 429/5xx responses: the only failures that trip a breaker or earn a retry."""
+    if isinstance(exc, ProviderUnavailableError):
+        return True
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, httpx.TransportError)):
+        return True
+    if isinstance(exc, (requests.HTTPError, httpx.HTTPStatusError)):
+        status = getattr(exc.response, "status_code", None)
+        return status is not None and (status == 429 or status >= 500)
+    return False
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, platform: str, retry_at: datetime) -> None:
+        super().__init__(f"{platform} publishing is paused after repeated provider errors; next try at {retry_at:%Y-%m-%d %H:%M:%S} UTC")
+        self.platform = platform
+        self.retry_at = retry_at
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open for ``reset_seconds`` -> one half-open probe."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: int) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = max(1, reset_seconds)
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def _retry_at_locked(self) -> datetime:
+        remaining = self.reset_seconds
+        if self._opened_at is not None:
+            remaining = max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+        return datetime.utcnow() + timedelta(seconds=remaining)
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self._state_locked()
+            if state == "closed":
+                return
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            raise CircuitOpenError(self.name, self._retry_at_locked())
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probe_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _record_error(self, exc: Exception) -> None:
+        if is_transient(exc):
+            self.record_failure()
+        elif isinstance(exc, PermanentPublishError):
+            # The provider answered (or was never asked): input problems say nothing about its health.
+            self.record_success()
+        else:
+            self.release_probe()
+
+    def call(self, fn, *args, **kwargs):
+        self.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            self._record_error(exc)
+            raise
+        self.record_success()
+        return result
+
+    async def acall(self, fn, *args, **kwargs):
+        self.before_call()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as exc:
+            self._record_error(exc)
+            raise
+        self.record_success()
+        return result
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(platform: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(platform)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                platform,
+                failure_threshold=settings.circuit_failure_threshold,
+                reset_seconds=settings.circuit_reset_seconds,
+            )
+            _breakers[platform] = breaker
+        return breaker
+
+
+def retry_delay_seconds(attempt: int) -> float:
+    """Exponential backoff with equal jitter for the ``attempt``-th failure (1-based)."""
+    ceiling = min(
+        float(settings.publish_retry_max_seconds),
+        float(settings.publish_retry_base_seconds) * (2 ** max(0, attempt - 1)),
+    )
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def schedule_retry(job: PublishJob, now: datetime | None = None) -> datetime | None:
+    """Count a failed attempt on ``job``; return the next attempt time or None once attempts run out."""
+    now = now or datetime.utcnow()
+    job.attempt_count = int(job.attempt_count or 0) + 1
+    if job.attempt_count >= max(1, settings.publish_max_attempts):
+        job.next_attempt_at = None
+        return None
+    job.next_attempt_at = now + timedelta(seconds=retry_delay_seconds(job.attempt_count))
+    return job.next_attempt_at
+
+
+def reset_retries(job: PublishJob) -> None:
+    job.attempt_count = 0
+    job.next_attempt_at = None
+
+
+def lease_expiry(now: datetime) -> datetime:
+    return now + timedelta(seconds=max(30, settings.publish_lease_seconds))
+
+
+def claim_publish_lease(db: Session, post_id: int, owner: str, now: datetime | None = None) -> bool:
+    """Compare-and-set the post's publish lease; False when another worker holds an unexpired one."""
+    now = now or datetime.utcnow()
+    claimed = (
+        db.query(GeneratedPost)
+        .filter(
+            GeneratedPost.id == post_id,
+            or_(GeneratedPost.lease_expires_at.is_(None), GeneratedPost.lease_expires_at < now),
+        )
+        .update(
+            {GeneratedPost.lease_owner: owner, GeneratedPost.lease_expires_at: lease_expiry(now)},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return claimed == 1
+
+
+def renew_publish_lease(db: Session, post_id: int, owner: str, now: datetime | None = None) -> bool:
+    """Extend ``owner``'s lease right before a send; False when it lapsed or the post is no longer queued."""
+    now = now or datetime.utcnow()
+    renewed = (
+        db.query(GeneratedPost)
+        .filter(
+            GeneratedPost.id == post_id,
+            GeneratedPost.status == PostStatus.scheduled.value,
+            GeneratedPost.lease_owner == owner,
+            GeneratedPost.lease_expires_at > now,
+        )
+        .update({GeneratedPost.lease_expires_at: lease_expiry(now)}, synchronize_session=False)
+    )
+    db.commit()
+    return renewed == 1
+
+
+def release_publish_lease(db: Session, post_id: int, owner: str) -> None:
+    # Conditional so a worker whose lease already lapsed cannot clear the lease of whoever holds it now.
+    db.query(GeneratedPost).filter(GeneratedPost.id == post_id, GeneratedPost.lease_owner == owner).update(
+        {GeneratedPost.lease_owner: "", GeneratedPost.lease_expires_at: None},
+        synchronize_session=False,
+    )
+
+
+def mark_post_sent(db: Session, post_id: int, external_post_id: str, error: Exception) -> None:
+    """Fallback when recording a successful send failed: the post is live, so at least take it out of the queue."""
+    db.query(GeneratedPost).filter(GeneratedPost.id == post_id).update(
+        {
+            GeneratedPost.status: PostStatus.posted.value,
+            GeneratedPost.posted_at: datetime.utcnow(),
+            GeneratedPost.external_post_id: external_post_id,
+            GeneratedPost.last_error: f"Published, but recording the result failed: {error}",
+        },
+        synchronize_session=False,
+    )
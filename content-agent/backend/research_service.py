@@ -2,72 +2,190 @@ from __future__ import annotations
 
 import html
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from email.utils import parsedate_to_datetime
 from urllib.parse import quote_plus
 from xml.etree import ElementTree
 
-import requests
 from sqlalchemy.orm import Session
 
+from backend import http_client
+from backend.bulk import insert_returning
 from backend.db_models import GeneratedPost, ResearchItem
+from config.settings import settings
 
 MAX_RESEARCH_ITEMS_PER_DAY = 5
 RSS_TIMEOUT = 30
+RSS_MAX_ITEMS = 50
+
+# Shared across runs so concurrent agent runs cannot multiply feed threads without bound.
+_feed_executor = ThreadPoolExecutor(max_workers=settings.research_fetch_workers, thread_name_prefix="rss")
+
+
+class _FeedEntry:
+    __slots__ = ("items", "fetched_at", "etag", "last_modified")
+
+    def __init__(self, items: list[dict], etag: str, last_modified: str) -> None:
+        self.items = items
+        self.fetched_at = time.monotonic()
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class FeedCache:
+    """Parsed feed items by URL, shared by every user and run; LRU-bounded, revalidated after the TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = max(0, ttl_seconds)
+        self._entries: OrderedDict[str, _FeedEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> _FeedEntry | None:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def is_fresh(self, entry: _FeedEntry) -> bool:
+        return time.monotonic() - entry.fetched_at < self.ttl_seconds
+
+    def put(self, url: str, items: list[dict], etag: str = "", last_modified: str = "") -> None:
+        with self._lock:
+            self._entries[url] = _FeedEntry(items, etag, last_modified)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def touch(self, url: str) -> None:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                entry.fetched_at = time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+feed_cache = FeedCache(settings.research_feed_cache_max_entries, settings.research_feed_cache_ttl_seconds)
+
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
 
 
 def _clean_text(value: str) -> str:
     if not value:
         return ""
     value = html.unescape(value)
-    value = re.sub(r"<[^>]+>", " ", value)
-    value = re.sub(r"\s+", " ", value)
+    if "<" in value:
+        value = _TAG_RE.sub(" ", value)
+    value = _SPACE_RE.sub(" ", value)
     return value.strip()
 
 
-def _parse_rss(xml_text: str) -> list[dict]:
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1] if "}" in tag else tag.rsplit(":", 1)[-1]
+
+
+def _parse_rss(stream, max_items: int = RSS_MAX_ITEMS) -> list[dict]:
+    """Incrementally parse ``<item>`` elements from a file-like feed body, stopping after ``max_items``."""
     out: list[dict] = []
-    root = ElementTree.fromstring(xml_text)
-    for item in root.findall(".//item"):
-        title = _clean_text(item.findtext("title") or "")
-        link = _clean_text(item.findtext("link") or "")
-        desc = _clean_text(item.findtext("description") or item.findtext("content:encoded") or "")
-        pub = item.findtext("pubDate") or ""
+    for _, elem in ElementTree.iterparse(stream, events=("end",)):
+        if _local_name(elem.tag) != "item":
+            continue
+        fields: dict[str, str] = {}
+        for child in elem:
+            name = _local_name(child.tag)
+            if name not in fields:
+                fields[name] = child.text or ""
+        # Drop the finished item so memory stays flat however long the feed is.
+        elem.clear()
+
+        title = _clean_text(fields.get("title", ""))
+        link = _clean_text(fields.get("link", ""))
+        if not (title and link):
+            continue
+        desc = _clean_text(fields.get("description") or fields.get("encoded") or "")
+        pub = fields.get("pubDate") or ""
         published_at = None
         if pub:
             try:
                 published_at = parsedate_to_datetime(pub).replace(tzinfo=None)
             except Exception:
                 published_at = None
-        if title and link:
-            out.append(
-                {
-                    "title": title,
-                    "url": link,
-                    "snippet": desc[:400],
-                    "published_at": published_at,
-                }
-            )
+        out.append(
+            {
+                "title": title,
+                "url": link,
+                "snippet": desc[:400],
+                "published_at": published_at,
+            }
+        )
+        if len(out) >= max_items:
+            break
     return out
 
 
-def _fetch_rss(source: str, url: str, limit: int) -> list[dict]:
+def _fetch_rss(source: str, url: str, limit: int, timeout: float = RSS_TIMEOUT) -> list[dict]:
     headers = {"User-Agent": "ContentRepurposingAgent/1.0"}
-    try:
-        response = requests.get(url, headers=headers, timeout=RSS_TIMEOUT)
-        if response.status_code >= 400:
+    cached = feed_cache.get(url)
+    if cached is not None and feed_cache.is_fresh(cached):
+        items = cached.items
+    else:
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        try:
+            with http_client.get(url, headers=headers, timeout=timeout, stream=True) as response:
+                if response.status_code == 304 and cached is not None:
+                    feed_cache.touch(url)
+                    items = cached.items
+                elif response.status_code >= 400:
+                    return []
+                else:
+                    response.raw.decode_content = True
+                    items = _parse_rss(response.raw)
+                    feed_cache.put(
+                        url,
+                        items,
+                        etag=response.headers.get("ETag", ""),
+                        last_modified=response.headers.get("Last-Modified", ""),
+                    )
+        except Exception:
             return []
-        items = _parse_rss(response.text)
-    except Exception:
-        return []
 
     out = []
     for item in items[: limit * 2]:
-        item["source"] = source
-        out.append(item)
+        out.append({**item, "source": source})
     return out[:limit]
 
 
+def _fetch_feeds(feeds: list[tuple[str, str]], limit: int) -> list[dict]:
+    """Fetch all feeds at once and keep, in feed order, whatever finished before the deadline."""
+    deadline_seconds = max(1.0, settings.research_fetch_deadline_seconds)
+    deadline = time.monotonic() + deadline_seconds
+    timeout = min(RSS_TIMEOUT, deadline_seconds)
+    futures = [_feed_executor.submit(_fetch_rss, source, url, limit, timeout) for source, url in feeds]
+    wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+
+    out: list[dict] = []
+    for future in futures:
+        if future.done() and not future.cancelled() and future.exception() is None:
+            out.extend(future.result())
+        else:
+            future.cancel()
+    return out
+
+
 def _collect_existing_post_insights(db: Session, user_id: str, niche: str, limit: int) -> list[dict]:
     rows = (
         db.query(GeneratedPost)
@@ -133,34 +251,33 @@ def collect_research_items(
     reddit_url = f"https://www.reddit.com/search.rss?q={quote_plus(query)}&sort=new&t=week"
     hn_url = f"https://hnrss.org/newest?q={quote_plus(query)}"
 
-    candidates: list[dict] = []
-    candidates.extend(_fetch_rss("google_news", google_url, remaining))
-    candidates.extend(_fetch_rss("reddit", reddit_url, remaining))
-    candidates.extend(_fetch_rss("rss", hn_url, remaining))
+    candidates = _fetch_feeds(
+        [("google_news", google_url), ("reddit", reddit_url), ("rss", hn_url)],
+        remaining,
+    )
     candidates.extend(_collect_existing_post_insights(db, user_id, niche, remaining))
 
     seen: set[str] = set()
-    created: list[ResearchItem] = []
+    rows: list[dict] = []
     for item in candidates:
         key = (item.get("url") or item.get("title") or "").strip().lower()
         if not key or key in seen:
             continue
         seen.add(key)
-        row = ResearchItem(
-            user_id=user_id,
-            run_id=run_id,
-            source=item.get("source", "rss"),
-            title=item.get("title", "")[:800],
-            url=item.get("url", "")[:1500],
-            snippet=item.get("snippet", "")[:1500],
-            published_at=item.get("published_at"),
+        rows.append(
+            {
+                "user_id": user_id,
+                "run_id": run_id,
+                "source": item.get("source", "rss"),
+                "title": item.get("title", "")[:800],
+                "url": item.get("url", "")[:1500],
+                "snippet": item.get("snippet", "")[:1500],
+                "published_at": item.get("published_at"),
+            }
         )
-        db.add(row)
-        created.append(row)
-        if len(created) >= remaining:
+        if len(rows) >= remaining:
             break
 
+    created = insert_returning(db, ResearchItem, rows)
     db.commit()
-    for row in created:
-        db.refresh(row)
     return created
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from config.settings import settings
+
+# Data each cached read depends on; mutations invalidate by the same names.
+POSTS = "posts"
+CLIENTS = "clients"
+PAYMENTS = "payments"
+METRICS = "metrics"
+SOCIAL = "social"
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    tags: frozenset[str]
+    expires_at: float
+
+
+class ResponseCache:
+    """Per-user JSON response cache with a short TTL, LRU bound and tag-based invalidation."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int) -> None:
+        self.ttl_seconds = max(1, ttl_seconds)
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[tuple[str, str], CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[(user_id, key)]
+                return None
+            self._entries.move_to_end((user_id, key))
+            return entry
+
+    def put(self, user_id: str, key: str, tags: tuple[str, ...], body: bytes) -> CachedResponse:
+        entry = CachedResponse(
+            body=body,
+            etag=f'W/"{hashlib.sha1(body).hexdigest()}"',
+            tags=frozenset(tags),
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        with self._lock:
+            self._entries[(user_id, key)] = entry
+            self._entries.move_to_end((user_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, user_id: str, *tags: str) -> None:
+        wanted = set(tags)
+        with self._lock:
+            stale = [
+                cache_key
+                for cache_key, entry in self._entries.items()
+                if cache_key[0] == user_id and (not wanted or entry.tags & wanted)
+            ]
+            for cache_key in stale:
+                del self._entries[cache_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(settings.response_cache_ttl_seconds, settings.response_cache_max_entries)
+
+
+def invalidate_user(user_id: str, *tags: str) -> None:
+    """Drop cached reads for ``user_id`` that depend on any of ``tags`` (all of them when no tags are given)."""
+    if user_id:
+        response_cache.invalidate(user_id, *tags)
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match", "")
+    return bool(header) and (header.strip() == "*" or etag in [x.strip() for x in header.split(",")])
+
+
+def cached_json(request: Request, user_id: str, tags: tuple[str, ...], build: Callable[[], object]) -> Response:
+    key = request.url.path
+    if request.url.query:
+        key = f"{key}?{request.url.query}"
+
+    entry = response_cache.get(user_id, key) if settings.response_cache_enabled else None
+    if entry is None:
+        body = json.dumps(jsonable_encoder(build()), separators=(",", ":")).encode("utf-8")
+        if settings.response_cache_enabled:
+            entry = response_cache.put(user_id, key, tags, body)
+        else:
+            entry = CachedResponse(body, f'W/"{hashlib.sha1(body).hexdigest()}"', frozenset(tags), 0.0)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if _matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
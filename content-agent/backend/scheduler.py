@@ -1,123 +1,560 @@
-from datetime import datetime
+import heapq
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import zip_longest
 
+from apscheduler.events import EVENT_SCHEDULER_SHUTDOWN
 from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import exists, func, or_
 from sqlalchemy.orm import Session
 
 from backend.analytics_service import record_publish_metric
-from backend.db_models import ClientProfile, GeneratedPost, PostClientLink, PostStatus, PublishJob
+from backend.billing_service import sweep_payment_auto_pause
+from backend.bulk import keep_loaded_on_commit
+from backend.credentials import CredentialCache
+from backend.db_models import ClientProfile, GeneratedPost, MediaAsset, PostClientLink, PostStatus, PublishJob
 from backend.facebook_service import publish_to_facebook
 from backend.instagram_service import publish_to_instagram
-from backend.media_service import list_post_media, refresh_media_signed_urls
+from backend.media_service import refresh_media_signed_urls
 from backend.linkedin_service import publish_to_linkedin
+from backend.publish_queue import (
+    CircuitOpenError,
+    breaker_for,
+    is_transient,
+    lease_expiry,
+    mark_post_sent,
+    release_publish_lease,
+    renew_publish_lease,
+    schedule_retry,
+)
+from backend.response_cache import CLIENTS, METRICS, POSTS, invalidate_user
+from config.settings import settings
 
+logger = logging.getLogger(__name__)
 
-def _touch_job(db: Session, post: GeneratedPost, status: str, error: str = "") -> None:
-    row = (
-        db.query(PublishJob)
-        .filter(PublishJob.user_id == post.user_id, PublishJob.post_id == post.id)
-        .first()
-    )
-    if not row:
-        row = PublishJob(user_id=post.user_id, post_id=post.id, platform=post.platform, status=status)
-        db.add(row)
+DEFAULT_PLATFORM_CONCURRENCY = 4
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+PUBLISHER_JOB_ID = "scheduled-publisher"
+NEXT_DUE_PRELOAD_LIMIT = 1000
+
+PUBLISHERS = {
+    "linkedin": publish_to_linkedin,
+    "facebook": publish_to_facebook,
+    "instagram": publish_to_instagram,
+}
+
+_next_due_tracker = None
+
+
+def _parse_platform_limits(raw: str) -> dict[str, int]:
+    limits: dict[str, int] = {}
+    for part in (raw or "").split(","):
+        name, _, value = part.partition("=")
+        name = name.strip().lower()
+        if not name:
+            continue
+        try:
+            limits[name] = max(1, int(value.strip()))
+        except ValueError:
+            continue
+    return limits
+
+
+class PublishPool:
+    """Bounded worker pool that also caps in-flight publishes per platform."""
+
+    def __init__(self, max_workers: int, platform_limits: dict[str, int] | None = None) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="publisher")
+        self._limits = platform_limits or {}
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, platform: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._semaphores.get(platform)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self._limits.get(platform, DEFAULT_PLATFORM_CONCURRENCY))
+                self._semaphores[platform] = sem
+            return sem
+
+    def submit(self, platform: str, fn, *args) -> Future:
+        sem = self._semaphore(platform)
+
+        def _run():
+            with sem:
+                return fn(*args)
+
+        return self._executor.submit(_run)
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+@dataclass
+class PublishContext:
+    """Everything a worker needs for one post, loaded up front for the whole claimed batch."""
+
+    post: GeneratedPost
+    client_id: int | None = None
+    service_paused: bool = False
+    media: list[MediaAsset] = field(default_factory=list)
+    job: PublishJob | None = None
+
+
+def _touch_job(
+    db: Session,
+    post: GeneratedPost,
+    job: PublishJob | None,
+    status: str,
+    error: str = "",
+    worker_id: str = WORKER_ID,
+) -> PublishJob:
+    if not job:
+        job = PublishJob(user_id=post.user_id, post_id=post.id, platform=post.platform, status=status)
+        db.add(job)
     else:
-        row.status = status
+        job.status = status
     now = datetime.utcnow()
-    row.attempted_at = now
+    job.attempted_at = now
     if status == "posted":
-        row.completed_at = now
-    row.error_message = error
+        job.completed_at = now
+    job.error_message = error
+    # Every terminal outcome goes through here, so this is where the publish lease is released.
+    release_publish_lease(db, post.id, worker_id)
+    return job
 
 
-def _is_service_paused_for_post(db: Session, post: GeneratedPost) -> bool:
-    link = (
-        db.query(PostClientLink)
-        .filter(PostClientLink.user_id == post.user_id, PostClientLink.post_id == post.id)
-        .first()
+def prefetch_publish_context(db: Session, post_ids: list[int], worker_id: str) -> list[PublishContext]:
+    """Load posts plus their client, media and job rows in a handful of set-based queries."""
+    if not post_ids:
+        return []
+    posts = (
+        db.query(GeneratedPost)
+        .filter(
+            GeneratedPost.id.in_(post_ids),
+            GeneratedPost.status == PostStatus.scheduled.value,
+            GeneratedPost.lease_owner == worker_id,
+        )
+        .all()
     )
-    if not link:
-        return False
-    client = (
-        db.query(ClientProfile)
-        .filter(ClientProfile.id == link.client_id, ClientProfile.user_id == post.user_id)
-        .first()
+    if not posts:
+        return []
+    ids = [post.id for post in posts]
+
+    links = db.query(PostClientLink).filter(PostClientLink.post_id.in_(ids)).all()
+    client_by_post = {link.post_id: link for link in links}
+    client_ids = {link.client_id for link in links}
+    clients = (
+        {row.id: row for row in db.query(ClientProfile).filter(ClientProfile.id.in_(client_ids)).all()}
+        if client_ids
+        else {}
+    )
+
+    media_by_post: dict[int, list[MediaAsset]] = {}
+    media_rows = (
+        db.query(MediaAsset)
+        .filter(MediaAsset.post_id.in_(ids))
+        .order_by(MediaAsset.post_id.asc(), MediaAsset.created_at.asc())
+        .all()
     )
-    if not client:
-        return False
-    return bool(client.service_paused)
+    for item in media_rows:
+        media_by_post.setdefault(item.post_id, []).append(item)
+
+    job_by_post: dict[int, PublishJob] = {}
+    for job in db.query(PublishJob).filter(PublishJob.post_id.in_(ids)).order_by(PublishJob.id.asc()).all():
+        job_by_post.setdefault(job.post_id, job)
 
+    contexts: list[PublishContext] = []
+    order = {post_id: idx for idx, post_id in enumerate(post_ids)}
+    for post in sorted(posts, key=lambda x: order.get(x.id, 0)):
+        link = client_by_post.get(post.id)
+        client = clients.get(link.client_id) if link and link.user_id == post.user_id else None
+        if client and client.user_id != post.user_id:
+            client = None
+        job = job_by_post.get(post.id)
+        contexts.append(
+            PublishContext(
+                post=post,
+                client_id=client.id if client else None,
+                service_paused=bool(client.service_paused) if client else False,
+                media=[x for x in media_by_post.get(post.id, []) if x.user_id == post.user_id],
+                job=job if job and job.user_id == post.user_id else None,
+            )
+        )
+    # Detach so each worker can merge its context into its own session without reloading.
+    db.expunge_all()
+    return contexts
+
+
+def _queue_retry(
+    db: Session, post: GeneratedPost, job: PublishJob | None, exc: Exception, worker_id: str = WORKER_ID
+) -> None:
+    if isinstance(exc, CircuitOpenError):
+        # The provider was never called, so this does not use up one of the post's attempts.
+        job = _touch_job(db, post, job, "deferred", str(exc), worker_id)
+        job.next_attempt_at = retry_at = exc.retry_at
+        post.last_error = str(exc)
+    else:
+        job = _touch_job(db, post, job, "retrying", str(exc), worker_id)
+        retry_at = schedule_retry(job)
+        if retry_at is None:
+            post.status = PostStatus.failed.value
+            post.last_error = str(exc)
+            job.status = "failed"
+        else:
+            post.last_error = f"{exc} (retry {job.attempt_count}/{settings.publish_max_attempts} at {retry_at:%Y-%m-%d %H:%M:%S} UTC)"
+    db.commit()
+    notify_schedule_change(retry_at)
 
-def process_scheduled_posts(db: Session) -> None:
+
+def _fail_post(db: Session, post: GeneratedPost, job: PublishJob | None, error: str, worker_id: str) -> None:
+    post.status = PostStatus.failed.value
+    post.last_error = error
+    _touch_job(db, post, job, "failed", error, worker_id)
+    db.commit()
+
+
+def _record_sent(db: Session, ctx: PublishContext, result: dict, worker_id: str) -> None:
+    post = ctx.post
     now = datetime.utcnow()
-    posts = (
+    post.status = PostStatus.posted.value
+    post.posted_at = now
+    post.external_post_id = result.get("external_post_id", "")
+    post.last_error = ""
+    job = _touch_job(db, post, ctx.job, "posted", "", worker_id)
+    job.next_attempt_at = None
+    if ctx.client_id:
+        record_publish_metric(
+            db,
+            user_id=post.user_id,
+            post_id=post.id,
+            platform=post.platform,
+            posted_at=now,
+            client_id=ctx.client_id,
+        )
+    db.commit()
+
+
+def _mark_sent(db: Session, post_id: int, result: dict, error: Exception, worker_id: str) -> None:
+    # Without its job row and metric, but the post must leave the queue or the next claim would publish it again.
+    db.rollback()
+    mark_post_sent(db, post_id, result.get("external_post_id", ""), error)
+    release_publish_lease(db, post_id, worker_id)
+    db.commit()
+
+
+def _publish_scheduled_post(
+    db: Session, ctx: PublishContext, credentials: CredentialCache | None = None, worker_id: str = WORKER_ID
+) -> None:
+    post = ctx.post
+    job = ctx.job
+    if ctx.service_paused:
+        _fail_post(db, post, job, "Service paused for this client due to unpaid subscription.", worker_id)
+        return
+    if post.platform == "twitter":
+        _fail_post(db, post, job, "Twitter free mode does not support automatic scheduling/publishing.", worker_id)
+        return
+    publisher = PUBLISHERS.get(post.platform)
+    if publisher is None:
+        _fail_post(db, post, job, f"Unsupported platform for scheduling: {post.platform}", worker_id)
+        return
+
+    content = post.edited_text.strip() if post.edited_text.strip() else post.generated_text
+    media = ctx.media
+
+    def _send() -> dict:
+        refresh_media_signed_urls(db, media)
+        return publisher(db, post.user_id, content, media_items=media, credentials=credentials)
+
+    # Only the provider call is retried; once it returns, the post is live and must never be re-queued.
+    try:
+        result = breaker_for(post.platform).call(_send)
+    except Exception as exc:
+        if isinstance(exc, CircuitOpenError) or is_transient(exc):
+            _queue_retry(db, post, job, exc, worker_id)
+        else:
+            _fail_post(db, post, job, str(exc), worker_id)
+        return
+
+    try:
+        _record_sent(db, ctx, result, worker_id)
+    except Exception as exc:
+        _mark_sent(db, post.id, result, exc, worker_id)
+
+
+def _publish_prefetched(
+    session_factory, ctx: PublishContext, credentials: CredentialCache | None = None, worker_id: str = WORKER_ID
+) -> None:
+    # Each worker owns its session so a slow provider call never holds another post's transaction.
+    db = session_factory()
+    try:
+        # A post can sit in the pool queue past its claim; if the lease lapsed another replica may own it by now.
+        # Renewed before merging, and commits keep the merged rows loaded, so the prefetch is never re-read.
+        if not renew_publish_lease(db, ctx.post.id, worker_id):
+            return
+        with keep_loaded_on_commit(db):
+            local = PublishContext(
+                post=db.merge(ctx.post, load=False),
+                client_id=ctx.client_id,
+                service_paused=ctx.service_paused,
+                media=[db.merge(item, load=False) for item in ctx.media],
+                job=db.merge(ctx.job, load=False) if ctx.job else None,
+            )
+            _publish_scheduled_post(db, local, credentials, worker_id)
+        invalidate_user(ctx.post.user_id, POSTS, METRICS, CLIENTS)
+    finally:
+        db.close()
+
+
+def _claimable(now: datetime) -> tuple:
+    """Filters for posts a worker may claim at ``now``: due, unleased (or lease lapsed) and not waiting on a retry."""
+    return (
+        GeneratedPost.status == PostStatus.scheduled.value,
+        GeneratedPost.scheduled_at <= now,
+        or_(GeneratedPost.lease_expires_at.is_(None), GeneratedPost.lease_expires_at < now),
+        ~exists().where(PublishJob.post_id == GeneratedPost.id, PublishJob.next_attempt_at > now),
+    )
+
+
+def claim_due_posts(db: Session, worker_id: str, now: datetime, limit: int) -> list[tuple[int, str]]:
+    """Lease up to ``limit`` due posts to ``worker_id`` so no other replica publishes them."""
+    lease_until = lease_expiry(now)
+    due = (
         db.query(GeneratedPost)
-        .filter(GeneratedPost.status == PostStatus.scheduled.value, GeneratedPost.scheduled_at <= now)
+        .filter(*_claimable(now))
+        .order_by(GeneratedPost.scheduled_at.asc(), GeneratedPost.id.asc())
+        .limit(max(1, limit))
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        rows = due.with_for_update(skip_locked=True).all()
+        claimed = [(row.id, row.platform) for row in rows]
+        for row in rows:
+            row.lease_owner = worker_id
+            row.lease_expires_at = lease_until
+        db.commit()
+        return claimed
+
+    # No SKIP LOCKED (SQLite): a conditional UPDATE acts as compare-and-set on the lease columns.
+    candidate_ids = [row.id for row in due.with_entities(GeneratedPost.id).all()]
+    if not candidate_ids:
+        return []
+    (
+        db.query(GeneratedPost)
+        .filter(
+            GeneratedPost.id.in_(candidate_ids),
+            GeneratedPost.status == PostStatus.scheduled.value,
+            or_(GeneratedPost.lease_expires_at.is_(None), GeneratedPost.lease_expires_at < now),
+        )
+        .update(
+            {GeneratedPost.lease_owner: worker_id, GeneratedPost.lease_expires_at: lease_until},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    rows = (
+        db.query(GeneratedPost.id, GeneratedPost.platform)
+        .filter(
+            GeneratedPost.id.in_(candidate_ids),
+            GeneratedPost.lease_owner == worker_id,
+            GeneratedPost.lease_expires_at == lease_until,
+        )
+        .order_by(GeneratedPost.scheduled_at.asc(), GeneratedPost.id.asc())
         .all()
     )
+    return [(row.id, row.platform) for row in rows]
+
+
+def _interleave_by_platform(due: list[tuple[int, str]]) -> list[tuple[int, str]]:
+    # Round-robin platforms so one saturated platform cannot occupy every worker slot.
+    buckets: dict[str, list[tuple[int, str]]] = {}
+    for post_id, platform in due:
+        buckets.setdefault(platform, []).append((post_id, platform))
+    ordered: list[tuple[int, str]] = []
+    for group in zip_longest(*buckets.values()):
+        ordered.extend(x for x in group if x is not None)
+    return ordered
+
+
+def process_scheduled_posts(session_factory, pool: PublishPool | None = None, worker_id: str = WORKER_ID) -> int:
+    owns_pool = pool is None
+    if owns_pool:
+        pool = PublishPool(
+            settings.publish_max_workers,
+            _parse_platform_limits(settings.publish_platform_concurrency),
+        )
+    published = 0
+    try:
+        while True:
+            db = session_factory()
+            # One account lookup and decrypt per (user, platform) for the whole batch, not per post.
+            credentials = CredentialCache()
+            try:
+                claimed = claim_due_posts(db, worker_id, datetime.utcnow(), settings.publish_claim_batch_size)
+                contexts = prefetch_publish_context(
+                    db,
+                    [post_id for post_id, _ in _interleave_by_platform(claimed)],
+                    worker_id,
+                )
+                credentials.prefetch(
+                    db, {(ctx.post.user_id, ctx.post.platform) for ctx in contexts if ctx.post.platform in PUBLISHERS}
+                )
+            finally:
+                db.close()
+            if not claimed:
+                break
+            futures = [
+                pool.submit(ctx.post.platform, _publish_prefetched, session_factory, ctx, credentials, worker_id)
+                for ctx in contexts
+            ]
+            wait(futures)
+            for ctx, future in zip(contexts, futures):
+                # A worker that raises has left its post leased; it is retried once the lease lapses.
+                try:
+                    future.result()
+                except Exception:
+                    logger.exception("Publishing scheduled post %s failed", ctx.post.id)
+                else:
+                    published += 1
+    finally:
+        if owns_pool:
+            pool.shutdown(wait=True)
+    return published
+
+
+class NextDueTracker:
+    """Keeps upcoming ``scheduled_at`` values in a min-heap and arms a one-shot job for the earliest."""
 
-    for post in posts:
+    def __init__(self, scheduler: BackgroundScheduler, run_due) -> None:
+        self._scheduler = scheduler
+        self._run_due = run_due
+        self._heap: list[datetime] = []
+        self._armed_for: datetime | None = None
+        self._lock = threading.Lock()
+
+    def reload(self, session_factory) -> None:
+        now = datetime.utcnow()
+        db = session_factory()
         try:
-            if _is_service_paused_for_post(db, post):
-                post.status = PostStatus.failed.value
-                post.last_error = "Service paused for this client due to unpaid subscription."
-                _touch_job(db, post, "failed", post.last_error)
-                db.commit()
-                continue
-
-            content = post.edited_text.strip() if post.edited_text.strip() else post.generated_text
-            if post.platform == "linkedin":
-                media = list_post_media(db, post.user_id, post.id)
-                refresh_media_signed_urls(db, media)
-                result = publish_to_linkedin(db, post.user_id, content, media_items=media)
-            elif post.platform == "facebook":
-                media = list_post_media(db, post.user_id, post.id)
-                refresh_media_signed_urls(db, media)
-                result = publish_to_facebook(db, post.user_id, content, media_items=media)
-            elif post.platform == "instagram":
-                media = list_post_media(db, post.user_id, post.id)
-                refresh_media_signed_urls(db, media)
-                result = publish_to_instagram(db, post.user_id, content, media_items=media)
-            elif post.platform == "twitter":
-                post.status = PostStatus.failed.value
-                post.last_error = "Twitter free mode does not support automatic scheduling/publishing."
-                _touch_job(db, post, "failed", post.last_error)
-                db.commit()
-                continue
-            else:
-                post.status = PostStatus.failed.value
-                post.last_error = f"Unsupported platform for scheduling: {post.platform}"
-                _touch_job(db, post, "failed", post.last_error)
-                db.commit()
-                continue
-            post.status = PostStatus.posted.value
-            post.posted_at = now
-            post.external_post_id = result.get("external_post_id", "")
-            post.last_error = ""
-            _touch_job(db, post, "posted", "")
-            record_publish_metric(
-                db,
-                user_id=post.user_id,
-                post_id=post.id,
-                platform=post.platform,
-                posted_at=now,
+            rows = (
+                db.query(GeneratedPost.scheduled_at)
+                .filter(GeneratedPost.status == PostStatus.scheduled.value, GeneratedPost.scheduled_at > now)
+                .order_by(GeneratedPost.scheduled_at.asc())
+                .limit(NEXT_DUE_PRELOAD_LIMIT)
+                .all()
             )
-            db.commit()
-        except Exception as exc:
-            post.status = PostStatus.failed.value
-            post.last_error = str(exc)
-            _touch_job(db, post, "failed", str(exc))
-            db.commit()
+            retries = (
+                db.query(PublishJob.next_attempt_at)
+                .join(GeneratedPost, GeneratedPost.id == PublishJob.post_id)
+                .filter(GeneratedPost.status == PostStatus.scheduled.value, PublishJob.next_attempt_at > now)
+                .order_by(PublishJob.next_attempt_at.asc())
+                .limit(NEXT_DUE_PRELOAD_LIMIT)
+                .all()
+            )
+            # Already-due work (overdue at startup, due during the last tick, lapsed lease) runs now, and a post
+            # leased by a worker that may die is looked at again when that lease runs out.
+            due_now = db.query(GeneratedPost.id).filter(*_claimable(now)).first() is not None
+            lease_ends = (
+                db.query(func.min(GeneratedPost.lease_expires_at))
+                .filter(
+                    GeneratedPost.status == PostStatus.scheduled.value,
+                    GeneratedPost.scheduled_at <= now,
+                    GeneratedPost.lease_expires_at >= now,
+                )
+                .scalar()
+            )
+        finally:
+            db.close()
+        with self._lock:
+            self._heap = [row.scheduled_at for row in rows] + [row.next_attempt_at for row in retries]
+            if due_now:
+                self._heap.append(now)
+            if lease_ends is not None:
+                self._heap.append(lease_ends)
+            heapq.heapify(self._heap)
+            self._armed_for = None
+            self._arm_locked()
+
+    def push(self, scheduled_at: datetime) -> None:
+        with self._lock:
+            heapq.heappush(self._heap, scheduled_at)
+            if self._armed_for is None or scheduled_at < self._armed_for:
+                self._arm_locked()
+
+    def _arm_locked(self) -> None:
+        if not self._heap:
+            self._armed_for = None
+            try:
+                self._scheduler.remove_job(PUBLISHER_JOB_ID)
+            except Exception:
+                pass
+            return
+        next_due = self._heap[0]
+        self._armed_for = next_due
+        # Never arm in the past: APScheduler would treat it as a misfire instead of running it.
+        run_at = max(next_due, datetime.utcnow()).replace(tzinfo=timezone.utc)
+        self._scheduler.add_job(
+            self._run_due,
+            "date",
+            run_date=run_at,
+            id=PUBLISHER_JOB_ID,
+            replace_existing=True,
+            misfire_grace_time=None,
+        )
+
+
+def notify_schedule_change(scheduled_at: datetime | None) -> None:
+    """Tell the next-due scheduler (if running) that a post is now due at ``scheduled_at``."""
+    tracker = _next_due_tracker
+    if tracker is None or scheduled_at is None:
+        return
+    tracker.push(scheduled_at)
 
 
 def create_scheduler(session_factory):
+    global _next_due_tracker
     scheduler = BackgroundScheduler()
+    pool = PublishPool(
+        settings.publish_max_workers,
+        _parse_platform_limits(settings.publish_platform_concurrency),
+    )
 
     def _job_wrapper():
-        db = session_factory()
-        try:
-            process_scheduled_posts(db)
-        finally:
-            db.close()
+        process_scheduled_posts(session_factory, pool)
+
+    if settings.scheduler_mode == "next_due":
+        tracker: NextDueTracker | None = None
+
+        def _run_due():
+            _job_wrapper()
+            tracker.reload(session_factory)
 
-    scheduler.add_job(_job_wrapper, "interval", minutes=1, id="scheduled-publisher", replace_existing=True)
+        tracker = NextDueTracker(scheduler, _run_due)
+        tracker.reload(session_factory)
+        _next_due_tracker = tracker
+        # Low-frequency safety net for schedules changed by other replicas.
+        scheduler.add_job(
+            _run_due,
+            "interval",
+            minutes=max(1, settings.scheduler_resync_minutes),
+            id="scheduled-publisher-resync",
+            replace_existing=True,
+        )
+    else:
+        scheduler.add_job(_job_wrapper, "interval", minutes=1, id=PUBLISHER_JOB_ID, replace_existing=True)
+    scheduler.add_job(
+        sweep_payment_auto_pause,
+        "interval",
+        args=[session_factory],
+        minutes=max(1, settings.billing_auto_pause_minutes),
+        id="billing-auto-pause",
+        replace_existing=True,
+    )
+    scheduler.add_listener(lambda _event: pool.shutdown(wait=False), EVENT_SCHEDULER_SHUTDOWN)
     return scheduler
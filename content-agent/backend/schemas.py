@@ -82,6 +82,7 @@ class LinkedInConnectStartResponse(BaseModel):
 
 class HistoryResponse(BaseModel):
     posts: list[DraftPost]
+    next_cursor: str | None = None
 
 
 class ResearchItemResponse(BaseModel):
@@ -109,11 +110,20 @@ class ContentPlanResponse(BaseModel):
 
 class AgentRunResponse(BaseModel):
     run_id: int
+    status: str = "completed"
     drafts: list[DraftPost]
     research_items: list[ResearchItemResponse]
     content_plans: list[ContentPlanResponse]
 
 
+class AgentRunStatusResponse(BaseModel):
+    run_id: int
+    status: str
+    error_text: str = ""
+    created_at: datetime
+    completed_at: datetime | None = None
+
+
 class ClientIntakeRequest(BaseModel):
     business_name: str = Field(..., min_length=1)
     industry: str = ""
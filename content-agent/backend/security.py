@@ -1,20 +1,44 @@
 import base64
 import os
-from cryptography.fernet import Fernet
+from functools import lru_cache
+from typing import Iterable
 
-from config.settings import settings
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 
+from config.settings import settings
 
-def _get_fernet() -> Fernet:
-    key = settings.encryption_key
-    if not key:
-        raise RuntimeError("ENCRYPTION_KEY is required")
 
+def _normalize_key(key: str) -> bytes:
     # Accept raw 32-byte secrets too and normalize to Fernet format.
     if len(key) == 32 and key.isascii():
         key = base64.urlsafe_b64encode(key.encode("utf-8")).decode("utf-8")
+    return key.encode("utf-8")
+
+
+def _split_keys(raw_keys: str) -> list[str]:
+    # ENCRYPTION_KEY is a comma-separated list, newest first: the first key encrypts, every key can decrypt.
+    keys = [key.strip() for key in raw_keys.split(",") if key.strip()]
+    if not keys:
+        raise RuntimeError("ENCRYPTION_KEY is required")
+    return keys
+
+
+@lru_cache(maxsize=4)
+def _build_cipher(raw_keys: str) -> MultiFernet:
+    return MultiFernet([Fernet(_normalize_key(key)) for key in _split_keys(raw_keys)])
+
 
-    return Fernet(key.encode("utf-8"))
+@lru_cache(maxsize=4)
+def _build_primary(raw_keys: str) -> Fernet | None:
+    # None while only one key is configured: then nothing can be under a retired key.
+    keys = _split_keys(raw_keys)
+    return Fernet(_normalize_key(keys[0])) if len(keys) > 1 else None
+
+
+def _get_fernet() -> MultiFernet:
+    if not settings.encryption_key:
+        raise RuntimeError("ENCRYPTION_KEY is required")
+    return _build_cipher(settings.encryption_key)
 
 
 def encrypt_text(value: str) -> str:
@@ -25,5 +49,30 @@ def decrypt_text(value: str) -> str:
     return _get_fernet().decrypt(value.encode("utf-8")).decode("utf-8")
 
 
+def decrypt_many(values: Iterable[str]) -> dict[str, str]:
+    """Decrypt a batch of tokens once each; returns ciphertext -> plaintext (empty values are skipped)."""
+    cipher = _get_fernet()
+    return {value: cipher.decrypt(value.encode("utf-8")).decode("utf-8") for value in set(values) if value}
+
+
+def needs_rotation(value: str) -> bool:
+    """True when ``value`` was encrypted under a retired key; only checks the HMAC, nothing is decrypted."""
+    if not value or not settings.encryption_key:
+        return False
+    primary = _build_primary(settings.encryption_key)
+    if primary is None:
+        return False
+    try:
+        primary.extract_timestamp(value.encode("utf-8"))
+    except InvalidToken:
+        return True
+    return False
+
+
+def rotate_text(value: str) -> str:
+    """Re-encrypt ``value`` under the current primary key so retired keys can be dropped from ENCRYPTION_KEY."""
+    return _get_fernet().rotate(value.encode("utf-8")).decode("utf-8")
+
+
 def generate_random_secret() -> str:
-    return os.urandom(32).hex()
\ No newline at end of file
+    return os.urandom(32).hex()
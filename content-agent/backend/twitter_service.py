@@ -9,8 +9,11 @@ import requests
 from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
 from sqlalchemy.orm import Session
 
+from backend import http_client
+from backend.credentials import CredentialCache, invalidate_credentials
 from backend.db_models import MediaAsset, OAuthState, SocialAccount
 from backend.media_service import download_media_bytes
+from backend.response_cache import CLIENTS, SOCIAL, invalidate_user
 from backend.security import decrypt_text, encrypt_text
 from config.settings import settings
 
@@ -83,7 +86,7 @@ def _exchange_code_for_token(code: str, code_verifier: str) -> dict:
         "client_id": settings.twitter_client_id,
         "code_verifier": code_verifier,
     }
-    resp = requests.post(TWITTER_TOKEN_URL, headers=headers, data=data, timeout=30)
+    resp = http_client.post(TWITTER_TOKEN_URL, headers=headers, data=data, timeout=30)
     if resp.status_code >= 400:
         raise RuntimeError(f"Twitter token exchange failed ({resp.status_code}): {resp.text}")
     return resp.json()
@@ -99,7 +102,7 @@ def _refresh_access_token(refresh_token: str) -> dict:
         "refresh_token": refresh_token,
         "client_id": settings.twitter_client_id,
     }
-    resp = requests.post(TWITTER_TOKEN_URL, headers=headers, data=data, timeout=30)
+    resp = http_client.post(TWITTER_TOKEN_URL, headers=headers, data=data, timeout=30)
     if resp.status_code >= 400:
         raise RuntimeError(f"Twitter refresh failed ({resp.status_code}): {resp.text}")
     return resp.json()
@@ -107,7 +110,7 @@ def _refresh_access_token(refresh_token: str) -> dict:
 
 def _fetch_twitter_profile(access_token: str) -> tuple[str, str]:
     headers = {"Authorization": f"Bearer {access_token}"}
-    resp = requests.get(TWITTER_USERINFO_URL, headers=headers, timeout=30)
+    resp = http_client.get(TWITTER_USERINFO_URL, headers=headers, timeout=30)
     if resp.status_code >= 400:
         raise RuntimeError(f"Twitter profile fetch failed ({resp.status_code}): {resp.text}")
     payload = resp.json().get("data", {})
@@ -176,6 +179,8 @@ def handle_twitter_callback(db: Session, code: str, state: str) -> str:
         )
 
     db.commit()
+    invalidate_user(user_id, SOCIAL, CLIENTS)
+    invalidate_credentials(user_id, "twitter")
     return account_name
 
 
@@ -184,7 +189,7 @@ def _post_tweet(access_token: str, content: str, media_ids: list[str] | None = N
     payload: dict = {"text": content}
     if media_ids:
         payload["media"] = {"media_ids": media_ids}
-    return requests.post(TWITTER_TWEET_CREATE_URL, headers=headers, json=payload, timeout=30)
+    return http_client.post(TWITTER_TWEET_CREATE_URL, headers=headers, json=payload, timeout=30)
 
 
 def _wait_for_media_ready(access_token: str, media_id: str, check_after_secs: int = 1) -> None:
@@ -192,7 +197,7 @@ def _wait_for_media_ready(access_token: str, media_id: str, check_after_secs: in
     wait_seconds = max(1, min(check_after_secs, 4))
     for _ in range(8):
         time.sleep(wait_seconds)
-        resp = requests.get(TWITTER_MEDIA_UPLOAD_URL, headers=headers, params={"id": media_id}, timeout=30)
+        resp = http_client.get(TWITTER_MEDIA_UPLOAD_URL, headers=headers, params={"id": media_id}, timeout=30)
         if resp.status_code == 401:
             raise TwitterUnauthorizedError("Twitter token expired")
         if resp.status_code >= 400:
@@ -227,7 +232,7 @@ def _upload_twitter_media(access_token: str, item: MediaAsset) -> str:
 
     last_error = ""
     for attempt in range(1, 4):
-        resp = requests.post(TWITTER_MEDIA_UPLOAD_URL, headers=headers, json=payload, timeout=60)
+        resp = http_client.post(TWITTER_MEDIA_UPLOAD_URL, headers=headers, json=payload, timeout=60)
         if resp.status_code == 401:
             raise TwitterUnauthorizedError("Twitter token expired")
         if resp.status_code < 400:
@@ -289,6 +294,7 @@ def _refresh_twitter_account_tokens(db: Session, account: SocialAccount) -> str:
     expires_in = int(refresh_data.get("expires_in") or 0)
     account.expires_at = datetime.utcnow() + timedelta(seconds=expires_in) if expires_in > 0 else None
     db.commit()
+    invalidate_credentials(account.user_id, "twitter")
     return access_token
 
 
@@ -297,16 +303,13 @@ def publish_to_twitter(
     user_id: str,
     content: str,
     media_items: list[MediaAsset] | None = None,
+    credentials: CredentialCache | None = None,
 ) -> dict:
-    account = (
-        db.query(SocialAccount)
-        .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "twitter")
-        .first()
-    )
-    if not account:
+    credential = (credentials or CredentialCache()).get(db, user_id, "twitter")
+    if not credential:
         raise RuntimeError("Twitter account is not connected")
 
-    access_token = decrypt_text(account.access_token_enc)
+    access_token = credential.access_token
     media_ids: list[str] = []
 
     try:
@@ -316,6 +319,13 @@ def publish_to_twitter(
         if response.status_code == 401:
             raise TwitterUnauthorizedError("Twitter token expired")
     except TwitterUnauthorizedError:
+        account = (
+            db.query(SocialAccount)
+            .filter(SocialAccount.user_id == user_id, SocialAccount.platform == "twitter")
+            .first()
+        )
+        if not account:
+            raise RuntimeError("Twitter account is not connected")
         access_token = _refresh_twitter_account_tokens(db, account)
         media_ids = _ensure_twitter_media_ids(db, access_token, media_items or [])
         response = _post_tweet(access_token, content, media_ids=media_ids)
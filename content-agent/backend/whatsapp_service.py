@@ -9,10 +9,12 @@ import time
 from datetime import datetime, timedelta
 from typing import Any
 
-import requests
 from sqlalchemy.orm import Session
 
+from backend import http_client
 from backend.db_models import ApprovalRequest, GeneratedPost, PostStatus
+from backend.response_cache import CLIENTS, POSTS, invalidate_user
+from backend.scheduler import notify_schedule_change
 from config.settings import settings
 
 WHATSAPP_API_VERSION = "v22.0"
@@ -106,7 +108,7 @@ def _send_template_message(to_number: str) -> None:
             "language": {"code": settings.whatsapp_template_lang},
         },
     }
-    resp = requests.post(_wa_messages_url(), headers=_wa_headers(), json=payload, timeout=30)
+    resp = http_client.post(_wa_messages_url(), headers=_wa_headers(), json=payload, timeout=30)
     if resp.status_code not in (200, 201):
         raise RuntimeError(f"WhatsApp template send failed: {resp.status_code} {resp.text[:220]}")
 
@@ -118,7 +120,7 @@ def _send_text_message(to_number: str, text: str) -> None:
         "type": "text",
         "text": {"preview_url": False, "body": text},
     }
-    resp = requests.post(_wa_messages_url(), headers=_wa_headers(), json=payload, timeout=30)
+    resp = http_client.post(_wa_messages_url(), headers=_wa_headers(), json=payload, timeout=30)
     if resp.status_code not in (200, 201):
         raise RuntimeError(f"WhatsApp text send failed: {resp.status_code} {resp.text[:220]}")
 
@@ -242,6 +244,9 @@ def resolve_whatsapp_approval(db: Session, token: str, action: str) -> dict[str,
     post.updated_at = now
     db.commit()
     db.refresh(post)
+    invalidate_user(user_id, POSTS, CLIENTS)
+    if post.status == PostStatus.scheduled.value:
+        notify_schedule_change(post.scheduled_at)
     return {"status": post.status, "message": message, "post_id": post.id}
 
 
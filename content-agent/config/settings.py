@@ -10,15 +10,69 @@ class Settings:
     frontend_url: str = os.getenv("FRONTEND_URL", "")
 
     database_url: str = os.getenv("DATABASE_URL", "")
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout_seconds: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    db_pool_recycle_seconds: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    db_pool_pre_ping: str = os.getenv("DB_POOL_PRE_PING", "idle").strip().lower()
+    db_pool_pre_ping_idle_seconds: float = float(os.getenv("DB_POOL_PRE_PING_IDLE_SECONDS", "60"))
+    db_statement_timeout_ms: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    db_pgbouncer_mode: bool = os.getenv("DB_PGBOUNCER_MODE", "false").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
 
     groq_api_base_url: str = os.getenv("GROQ_API_BASE_URL", "https://api.groq.com/openai/v1")
     groq_api_key: str = os.getenv("GROQ_API_KEY", "")
     groq_model: str = os.getenv("GROQ_MODEL", "llama3-8b-8192")
+    groq_max_concurrency: int = int(os.getenv("GROQ_MAX_CONCURRENCY", "5"))
+    groq_call_timeout_seconds: float = float(os.getenv("GROQ_CALL_TIMEOUT_SECONDS", "60"))
+    groq_run_deadline_seconds: float = float(os.getenv("GROQ_RUN_DEADLINE_SECONDS", "120"))
+    groq_generation_mode: str = os.getenv("GROQ_GENERATION_MODE", "per_platform").strip().lower()
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "true").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
+    llm_cache_max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+    llm_cache_ttl_seconds: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    llm_cache_sqlite_path: str = os.getenv("LLM_CACHE_SQLITE_PATH", "")
+    llm_cache_sqlite_max_rows: int = int(os.getenv("LLM_CACHE_SQLITE_MAX_ROWS", "5000"))
+    http_pool_connections: int = int(os.getenv("HTTP_POOL_CONNECTIONS", "20"))
+    http_pool_maxsize: int = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+    http_async_max_connections: int = int(os.getenv("HTTP_ASYNC_MAX_CONNECTIONS", "200"))
+    http_connect_timeout_seconds: float = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+    http_read_timeout_seconds: float = float(os.getenv("HTTP_READ_TIMEOUT_SECONDS", "30"))
+    http_retry_total: int = int(os.getenv("HTTP_RETRY_TOTAL", "2"))
+    http_retry_backoff_seconds: float = float(os.getenv("HTTP_RETRY_BACKOFF_SECONDS", "0.5"))
+    http_retry_after_max_seconds: float = float(os.getenv("HTTP_RETRY_AFTER_MAX_SECONDS", "5"))
+    research_fetch_workers: int = int(os.getenv("RESEARCH_FETCH_WORKERS", "8"))
+    research_fetch_deadline_seconds: float = float(os.getenv("RESEARCH_FETCH_DEADLINE_SECONDS", "12"))
+    research_feed_cache_ttl_seconds: int = int(os.getenv("RESEARCH_FEED_CACHE_TTL_SECONDS", "900"))
+    research_feed_cache_max_entries: int = int(os.getenv("RESEARCH_FEED_CACHE_MAX_ENTRIES", "256"))
+    agent_run_workers: int = int(os.getenv("AGENT_RUN_WORKERS", "4"))
+    agent_stage_workers: int = int(os.getenv("AGENT_STAGE_WORKERS", "8"))
+    agent_run_stale_minutes: int = int(os.getenv("AGENT_RUN_STALE_MINUTES", "30"))
+    response_cache_enabled: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
+    response_cache_ttl_seconds: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "15"))
+    response_cache_max_entries: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
     gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
     gemini_image_model: str = os.getenv("GEMINI_IMAGE_MODEL", "gemini-2.0-flash-preview-image-generation")
 
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_jwks_url: str = os.getenv("SUPABASE_JWKS_URL", "")
+    auth_jwks_ttl_seconds: int = int(os.getenv("AUTH_JWKS_TTL_SECONDS", "3600"))
+    auth_jwks_min_refetch_seconds: int = int(os.getenv("AUTH_JWKS_MIN_REFETCH_SECONDS", "30"))
+    auth_jwks_timeout_seconds: float = float(os.getenv("AUTH_JWKS_TIMEOUT_SECONDS", "5"))
+    auth_token_cache_max_entries: int = int(os.getenv("AUTH_TOKEN_CACHE_MAX_ENTRIES", "10000"))
     supabase_service_role_key: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
     supabase_storage_bucket: str = os.getenv("SUPABASE_STORAGE_BUCKET", "post-media")
 
@@ -57,6 +111,21 @@ class Settings:
         "yes",
         "on",
     }
+    publish_max_workers: int = int(os.getenv("PUBLISH_MAX_WORKERS", "8"))
+    publish_platform_concurrency: str = os.getenv(
+        "PUBLISH_PLATFORM_CONCURRENCY",
+        "linkedin=4,facebook=4,instagram=2",
+    )
+    publish_claim_batch_size: int = int(os.getenv("PUBLISH_CLAIM_BATCH_SIZE", "200"))
+    publish_lease_seconds: int = int(os.getenv("PUBLISH_LEASE_SECONDS", "600"))
+    scheduler_mode: str = os.getenv("SCHEDULER_MODE", "interval").strip().lower()
+    scheduler_resync_minutes: int = int(os.getenv("SCHEDULER_RESYNC_MINUTES", "10"))
+    billing_auto_pause_minutes: int = int(os.getenv("BILLING_AUTO_PAUSE_MINUTES", "15"))
+    publish_max_attempts: int = int(os.getenv("PUBLISH_MAX_ATTEMPTS", "5"))
+    publish_retry_base_seconds: int = int(os.getenv("PUBLISH_RETRY_BASE_SECONDS", "60"))
+    publish_retry_max_seconds: int = int(os.getenv("PUBLISH_RETRY_MAX_SECONDS", "3600"))
+    circuit_failure_threshold: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    circuit_reset_seconds: int = int(os.getenv("CIRCUIT_RESET_SECONDS", "120"))
 
 
 settings = Settings()
@@ -7,6 +7,8 @@ const state = {
   activePage: "dashboard",
   clients: [],
   drafts: [],
+  scheduledPosts: [],
+  scheduledCount: 0,
   templates: [],
   payments: [],
   pendingApprovals: 0,
@@ -166,7 +168,7 @@ function renderNotificationPanel() {
       detail: "Open Draft Workflow and send reminders or finalize approval.",
     });
   }
-  const scheduled = state.drafts.filter((d) => d.status === "scheduled").length;
+  const scheduled = state.scheduledCount;
   if (scheduled > 0) {
     notifications.push({
       title: `${scheduled} post(s) scheduled`,
@@ -402,8 +404,8 @@ function renderCalendarBoard() {
   if (!refs.calendarBoard) return;
   const days = weekDates(7);
   const byDay = new Map(days.map((d) => [dateKey(d), []]));
-  state.drafts
-    .filter((d) => d.status === "scheduled" && d.scheduled_at)
+  state.scheduledPosts
+    .filter((d) => d.scheduled_at)
     .forEach((d) => {
       const key = dateKey(d.scheduled_at);
       if (!byDay.has(key)) return;
@@ -443,7 +445,7 @@ function renderCalendarBoard() {
 }
 
 function renderCalendarPosts() {
-  const scheduled = state.drafts.filter((d) => d.status === "scheduled");
+  const scheduled = state.scheduledPosts;
   renderCalendarBoard();
   if (!scheduled.length) {
     refs.calendarPostsList.innerHTML = "<p class='muted'>No scheduled posts yet.</p>";
@@ -555,7 +557,8 @@ function renderTemplatePreview() {
 async function loadDashboard() {
   const data = await api("/api/dashboard/overview");
   refs.statClients.textContent = String(data.total_clients || 0);
-  refs.statScheduled.textContent = String(data.scheduled_posts || 0);
+  state.scheduledCount = Number(data.scheduled_posts || 0);
+  refs.statScheduled.textContent = String(state.scheduledCount);
   const interactions = Number(state.analyticsTotals.likes || 0)
     + Number(state.analyticsTotals.shares || 0)
     + Number(state.analyticsTotals.comments || 0)
@@ -579,8 +582,17 @@ async function loadClients() {
 }
 
 async function loadDrafts() {
-  const data = await api("/api/drafts");
-  state.drafts = data.posts || [];
+  // Each view loads only its own window: recent drafts for the editor and top posts, scheduled posts up to the
+  // end of the calendar week. The scheduled total comes from /api/dashboard/overview.
+  const calendarEnd = weekDates(8)[7].toISOString();
+  const [recent, scheduled] = await Promise.all([
+    api("/api/drafts?limit=200&include_input=false"),
+    api(
+      `/api/drafts?status=scheduled&scheduled_before=${encodeURIComponent(calendarEnd)}&limit=200&include_input=false&text_limit=220`,
+    ),
+  ]);
+  state.drafts = recent.posts || [];
+  state.scheduledPosts = scheduled.posts || [];
   renderDrafts();
   renderCalendarPosts();
   renderTopPosts();
@@ -655,6 +667,25 @@ async function loadAnalytics() {
   renderTopPosts();
 }
 
+const AGENT_RUN_STAGE_LABELS = {
+  queued: "Queued...",
+  researching: "Researching trends...",
+  planning: "Planning calendar...",
+  generating: "Writing drafts...",
+  rendering: "Rendering visuals...",
+};
+
+async function waitForAgentRun(runId, { intervalMs = 2000, timeoutMs = 10 * 60 * 1000 } = {}) {
+  const startedAt = Date.now();
+  while (Date.now() - startedAt < timeoutMs) {
+    const run = await api(`/api/agent/runs/${runId}`);
+    if (run.status === "completed" || run.status === "failed") return run;
+    setBanner(AGENT_RUN_STAGE_LABELS[run.status] || "Generating drafts...");
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+  throw new Error("Agent run is taking longer than expected. Check drafts again shortly.");
+}
+
 async function refreshAll() {
   withSkeleton(refs.statClients.parentElement);
   await Promise.all([loadClients(), loadDrafts(), loadPayments(), loadCanvaTemplates(), loadSocial()]);
@@ -902,10 +933,12 @@ refs.generatorForm.addEventListener("submit", async (event) => {
     };
     if (client?.id) payload.client_id = client.id;
 
-    await api("/api/agent/run", {
+    const queued = await api("/api/agent/run", {
       method: "POST",
       body: JSON.stringify(payload),
     });
+    const run = await waitForAgentRun(queued.run_id);
+    if (run.status === "failed") throw new Error(run.error_text || "Agent run failed");
     setBanner("Drafts generated.");
     await Promise.all([loadDrafts(), loadDashboard()]);
   } catch (e) {
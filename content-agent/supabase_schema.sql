@@ -28,12 +28,21 @@ create table if not exists generated_posts (
   posted_at timestamptz null,
   external_post_id text default '',
   last_error text default '',
+  lease_owner text default '',
+  lease_expires_at timestamptz null,
   created_at timestamptz default now(),
   updated_at timestamptz default now()
 );
 
+alter table generated_posts add column if not exists lease_owner text default '';
+alter table generated_posts add column if not exists lease_expires_at timestamptz null;
+
 create index if not exists idx_generated_posts_user on generated_posts(user_id);
 create index if not exists idx_generated_posts_status on generated_posts(status);
+create index if not exists idx_generated_posts_user_created on generated_posts(user_id, created_at, id);
+create index if not exists idx_generated_posts_user_status_created on generated_posts(user_id, status, created_at, id);
+create index if not exists idx_generated_posts_user_platform_created on generated_posts(user_id, platform, created_at, id);
+create index if not exists idx_generated_posts_scheduled_due on generated_posts(scheduled_at, id) where status = 'scheduled';
 
 create table if not exists oauth_states (
   id bigserial primary key,
@@ -64,6 +73,7 @@ create table if not exists media_assets (
 
 create index if not exists idx_media_assets_user on media_assets(user_id);
 create index if not exists idx_media_assets_post on media_assets(post_id);
+create index if not exists idx_media_assets_user_post on media_assets(user_id, post_id);
 
 create table if not exists agent_runs (
   id bigserial primary key,
@@ -132,6 +142,7 @@ create table if not exists approval_requests (
 
 create index if not exists idx_approval_requests_user on approval_requests(user_id);
 create index if not exists idx_approval_requests_post on approval_requests(post_id);
+create index if not exists idx_approval_requests_user_post on approval_requests(user_id, post_id);
 
 create table if not exists publish_jobs (
   id bigserial primary key,
@@ -142,14 +153,22 @@ create table if not exists publish_jobs (
   scheduled_at timestamptz null,
   attempted_at timestamptz null,
   completed_at timestamptz null,
+  attempt_count integer default 0,
+  next_attempt_at timestamptz null,
   error_message text default '',
   created_at timestamptz default now(),
   updated_at timestamptz default now()
 );
 
+alter table publish_jobs add column if not exists attempt_count integer default 0;
+alter table publish_jobs add column if not exists next_attempt_at timestamptz null;
+
 create index if not exists idx_publish_jobs_user on publish_jobs(user_id);
 create index if not exists idx_publish_jobs_post on publish_jobs(post_id);
 create index if not exists idx_publish_jobs_status on publish_jobs(status);
+create index if not exists idx_publish_jobs_next_attempt on publish_jobs(next_attempt_at);
+create index if not exists idx_publish_jobs_user_post on publish_jobs(user_id, post_id);
+create index if not exists idx_publish_jobs_post_next_attempt on publish_jobs(post_id, next_attempt_at);
 
 create table if not exists client_profiles (
   id bigserial primary key,
@@ -210,6 +229,9 @@ create table if not exists client_performance_metrics (
 create index if not exists idx_client_perf_user on client_performance_metrics(user_id);
 create index if not exists idx_client_perf_client on client_performance_metrics(client_id);
 create index if not exists idx_client_perf_date on client_performance_metrics(metric_date);
+create index if not exists idx_client_perf_user_client_date on client_performance_metrics(user_id, client_id, metric_date);
+create index if not exists idx_client_perf_user_date on client_performance_metrics(user_id, metric_date);
+create unique index if not exists uq_client_perf_daily on client_performance_metrics(user_id, client_id, platform, metric_date);
 
 create table if not exists post_client_links (
   id bigserial primary key,
@@ -222,6 +244,7 @@ create table if not exists post_client_links (
 
 create index if not exists idx_post_client_links_user on post_client_links(user_id);
 create index if not exists idx_post_client_links_client on post_client_links(client_id);
+create index if not exists idx_post_client_links_client_post on post_client_links(client_id, post_id);
 
 create table if not exists plan_client_links (
   id bigserial primary key,
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.auth import get_current_user_id
+from backend.db_models import AgentRun
+
+
+@pytest.fixture
+def client():
+    main.app.dependency_overrides[get_current_user_id] = lambda: "u1"
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.pop(get_current_user_id, None)
+
+
+class _ShutDownExecutor:
+    def submit(self, fn, *args):
+        raise RuntimeError("cannot schedule new futures after shutdown")
+
+
+def test_a_run_that_cannot_be_submitted_is_marked_failed(db, client, monkeypatch):
+    monkeypatch.setattr(main, "agent_executor", _ShutDownExecutor())
+    monkeypatch.setattr(main, "apply_payment_auto_pause", lambda db, user_id: None)
+
+    response = client.post("/api/agent/run", json={"content": "Launch week recap", "platforms": ["linkedin"]})
+
+    assert response.status_code == 503
+    run = db.query(AgentRun).one()
+    assert run.status == "failed"
+    assert "after shutdown" in run.error_text
+    assert run.completed_at is not None
+
+
+def test_startup_fails_runs_left_in_flight_by_a_previous_process(db):
+    old = datetime.utcnow() - timedelta(hours=2)
+    for status, created_at in (
+        ("queued", old),
+        ("generating", old),
+        ("completed", old),
+        ("researching", datetime.utcnow()),
+    ):
+        db.add(AgentRun(user_id="u1", source_content="x", status=status, created_at=created_at))
+    db.commit()
+
+    main._fail_stale_agent_runs()
+
+    db.expire_all()
+    statuses = sorted((run.status, run.created_at == old) for run in db.query(AgentRun).all())
+    # Recent runs may belong to another live replica and are left alone.
+    assert statuses == [("completed", True), ("failed", True), ("failed", True), ("researching", False)]
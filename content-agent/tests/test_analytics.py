@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from backend.analytics_service import record_publish_metric
+from backend.database import SessionLocal, engine
+from backend.db_models import ClientPerformanceMetric, ClientProfile
+from backend.migrations import run_migrations
+
+
+def _client(db) -> int:
+    client = ClientProfile(user_id="u1", business_name="Acme")
+    db.add(client)
+    db.commit()
+    return client.id
+
+
+def test_publishers_sharing_a_client_day_add_to_one_row(db):
+    client_id = _client(db)
+    posted_at = datetime(2026, 3, 4, 9, 30)
+
+    # Separate sessions stand in for parallel publish workers.
+    for post_id in (1, 2, 3):
+        worker = SessionLocal()
+        try:
+            record_publish_metric(
+                worker, user_id="u1", post_id=post_id, platform="linkedin", posted_at=posted_at, client_id=client_id
+            )
+            worker.commit()
+        finally:
+            worker.close()
+
+    rows = db.query(ClientPerformanceMetric).all()
+    assert len(rows) == 1
+    assert rows[0].metric_date == datetime(2026, 3, 4)
+    assert rows[0].likes >= 3 * 30
+
+
+def test_migration_folds_duplicate_metric_days_before_enforcing_uniqueness(db):
+    client_id = _client(db)
+    with engine.begin() as conn:
+        conn.execute(text("drop index uq_client_perf_daily"))
+        for likes in (10, 20, 30):
+            conn.execute(
+                text(
+                    "insert into client_performance_metrics"
+                    " (user_id, client_id, platform, metric_date, likes, shares, comments, clicks, follower_growth, created_at)"
+                    " values ('u1', :client_id, 'linkedin', '2026-03-04 00:00:00.000000', :likes, 1, 1, 1, 1, '2026-03-04 00:00:00.000000')"
+                ),
+                {"client_id": client_id, "likes": likes},
+            )
+        conn.execute(text("delete from schema_migrations where version = 5"))
+
+    assert run_migrations(engine) == [5]
+
+    rows = db.query(ClientPerformanceMetric).all()
+    assert [(row.likes, row.shares, row.follower_growth) for row in rows] == [(60, 3, 3)]
+    assert "uq_client_perf_daily" in {index["name"] for index in inspect(engine).get_indexes("client_performance_metrics")}
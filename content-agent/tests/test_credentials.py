@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy.orm import Session
+
+from backend import credentials, database, http_client
+from backend.credentials import CredentialCache
+from backend.db_models import GeneratedPost, SocialAccount
+from backend.facebook_service import publish_to_facebook
+from backend.security import encrypt_text, needs_rotation
+from config.settings import settings
+from tests.conftest import FakeResponse
+
+
+class _FailingCommitSession(Session):
+    def commit(self) -> None:
+        raise RuntimeError("rotation commit failed")
+
+
+@pytest.fixture
+def stale_account(db, monkeypatch):
+    """A facebook account encrypted under the old key, then a new primary key put in front of it."""
+    account = SocialAccount(
+        user_id="u1",
+        platform="facebook",
+        account_id="page",
+        account_name="Page",
+        access_token_enc=encrypt_text("token"),
+        refresh_token_enc=encrypt_text("refresh"),
+    )
+    post = GeneratedPost(user_id="u1", platform="facebook", input_content="x", generated_text="hello", status="approved")
+    db.add_all([account, post])
+    db.commit()
+    monkeypatch.setattr(settings, "encryption_key", f"{Fernet.generate_key().decode()},{settings.encryption_key}")
+    monkeypatch.setattr(http_client, "request", lambda method, url, **kwargs: FakeResponse(payload={"id": "page_post"}))
+    return account.id, post.id
+
+
+def _stored_tokens(account_id: int) -> tuple[str, str]:
+    with database.SessionLocal() as fresh:
+        row = fresh.get(SocialAccount, account_id)
+        return row.access_token_enc, row.refresh_token_enc
+
+
+def _stored_last_error(post_id: int) -> str:
+    with database.SessionLocal() as fresh:
+        return fresh.get(GeneratedPost, post_id).last_error
+
+
+def test_failed_rotation_mid_publish_leaves_the_callers_transaction_alone(db, stale_account, monkeypatch):
+    account_id, post_id = stale_account
+    before = _stored_tokens(account_id)
+    monkeypatch.setattr(credentials, "Session", _FailingCommitSession)
+
+    post = db.get(GeneratedPost, post_id)
+    post.last_error = "in flight"
+    result = publish_to_facebook(db, "u1", "hello")
+
+    assert result["external_post_id"] == "page_post"
+    assert post in db.dirty
+    assert _stored_last_error(post_id) == ""
+    assert _stored_tokens(account_id) == before
+
+
+def test_rotation_mid_publish_rotates_without_committing_the_caller(db, stale_account):
+    account_id, post_id = stale_account
+
+    post = db.get(GeneratedPost, post_id)
+    post.last_error = "in flight"
+    publish_to_facebook(db, "u1", "hello")
+
+    assert post in db.dirty
+    assert _stored_last_error(post_id) == ""
+    access, refresh = _stored_tokens(account_id)
+    assert not needs_rotation(access) and not needs_rotation(refresh)
+
+
+def test_rotation_inside_run_sync_keeps_the_async_transaction_open(db, stale_account):
+    account_id, post_id = stale_account
+
+    async def run() -> None:
+        database.get_async_engine()
+        try:
+            async with database._async_sessionmaker() as adb:
+                post = await adb.get(GeneratedPost, post_id)
+                post.last_error = "in flight"
+                credential = await CredentialCache().aget(adb, "u1", "facebook")
+                assert credential.access_token == "token"
+                assert post in adb.dirty
+        finally:
+            await database.dispose_async_engine()
+
+    asyncio.run(run())
+    assert _stored_last_error(post_id) == ""
+    assert not needs_rotation(_stored_tokens(account_id)[0])
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.auth import get_current_user_id
+from backend.db_models import GeneratedPost
+from backend.main import app
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_user_id] = lambda: "u1"
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_current_user_id, None)
+
+
+def test_scheduled_before_limits_drafts_to_the_calendar_window(db, client):
+    now = datetime.utcnow()
+    for days in (1, 3, 30):
+        db.add(
+            GeneratedPost(
+                user_id="u1",
+                platform="linkedin",
+                input_content="x",
+                generated_text=f"in {days} days",
+                status="scheduled",
+                scheduled_at=now + timedelta(days=days),
+            )
+        )
+    db.add(GeneratedPost(user_id="u1", platform="linkedin", input_content="x", generated_text="draft", status="draft"))
+    db.commit()
+
+    window_end = (now + timedelta(days=7)).isoformat() + "Z"
+    response = client.get("/api/drafts", params={"status": "scheduled", "scheduled_before": window_end, "text_limit": 5})
+
+    assert response.status_code == 200
+    assert sorted(post["generated_text"] for post in response.json()["posts"]) == ["in 1 ", "in 3 "]
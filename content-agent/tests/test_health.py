@@ -0,0 +1,19 @@
+from fastapi.testclient import TestClient
+
+from backend.auth import get_current_user_id
+from backend.main import app
+
+
+def test_db_pool_stats_require_a_signed_in_user():
+    client = TestClient(app)
+
+    assert client.get("/health").status_code == 200
+    assert client.get("/health/db-pool").status_code == 401
+
+    app.dependency_overrides[get_current_user_id] = lambda: "u1"
+    try:
+        response = client.get("/health/db-pool")
+    finally:
+        app.dependency_overrides.pop(get_current_user_id, None)
+    assert response.status_code == 200
+    assert "pool_class" in response.json()
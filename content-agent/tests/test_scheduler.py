@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from backend import http_client, scheduler
+from backend.credentials import CredentialCache
+from backend.database import SessionLocal, engine
+from backend.db_models import GeneratedPost, MediaAsset, SocialAccount
+from backend.security import encrypt_text
+from tests.conftest import FakeResponse
+
+
+def _fake_provider(method, url, **kwargs):
+    if "/object/sign/" in url:
+        return FakeResponse(payload={"signedURL": f"/object/sign/{url.rsplit('/', 1)[-1]}?token=1"})
+    if "/storage/v1/object/" in url:
+        return FakeResponse(content=b"PNG")
+    return FakeResponse(payload={"id": "page_post"})
+
+
+def _seed_scheduled_posts(db, count: int, media_per_post: int) -> None:
+    db.add(
+        SocialAccount(
+            user_id="u1",
+            platform="facebook",
+            account_id="page",
+            account_name="Page",
+            access_token_enc=encrypt_text("token"),
+            refresh_token_enc="",
+        )
+    )
+    due = datetime.utcnow() - timedelta(minutes=1)
+    posts = [
+        GeneratedPost(
+            user_id="u1", platform="facebook", input_content="x", generated_text=f"post {i}", status="scheduled", scheduled_at=due
+        )
+        for i in range(count)
+    ]
+    db.add_all(posts)
+    db.flush()
+    for post in posts:
+        for j in range(media_per_post):
+            db.add(
+                MediaAsset(
+                    user_id="u1",
+                    post_id=post.id,
+                    platform="facebook",
+                    file_name=f"{j}.png",
+                    mime_type="image/png",
+                    file_size=3,
+                    storage_path=f"u1/{post.id}-{j}.png",
+                    file_url="",
+                )
+            )
+    db.commit()
+
+
+def test_publishing_a_prefetched_post_never_reselects_its_rows(db, monkeypatch):
+    monkeypatch.setattr(http_client, "request", _fake_provider)
+    _seed_scheduled_posts(db, count=5, media_per_post=2)
+
+    claimed = scheduler.claim_due_posts(db, "worker", datetime.utcnow(), 10)
+    contexts = scheduler.prefetch_publish_context(db, [post_id for post_id, _ in claimed], "worker")
+    credentials = CredentialCache()
+    credentials.prefetch(db, {("u1", "facebook")})
+    db.close()
+
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()).lower())
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        for ctx in contexts:
+            scheduler._publish_prefetched(SessionLocal, ctx, credentials, "worker")
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert len(contexts) == 5
+    assert [s for s in statements if s.startswith("select")] == []
+    # Lease renewal, signed-URL update, job insert, post update and lease release.
+    assert len(statements) / len(contexts) <= 5
+    assert {post.status for post in db.query(GeneratedPost).all()} == {"posted"}
+
+
+class _RecordingScheduler:
+    def __init__(self) -> None:
+        self.run_date: datetime | None = None
+
+    def add_job(self, func, trigger, run_date=None, **kwargs) -> None:
+        self.run_date = run_date.replace(tzinfo=None)
+
+    def remove_job(self, job_id) -> None:
+        self.run_date = None
+
+
+def _scheduled_post(db, scheduled_at: datetime, lease_expires_at: datetime | None = None) -> None:
+    db.add(
+        GeneratedPost(
+            user_id="u1",
+            platform="facebook",
+            input_content="x",
+            generated_text="post",
+            status="scheduled",
+            scheduled_at=scheduled_at,
+            lease_owner="other-worker" if lease_expires_at else "",
+            lease_expires_at=lease_expires_at,
+        )
+    )
+    db.commit()
+
+
+def _armed_for(db) -> datetime | None:
+    recorder = _RecordingScheduler()
+    scheduler.NextDueTracker(recorder, lambda: None).reload(SessionLocal)
+    return recorder.run_date
+
+
+def test_next_due_tracker_runs_a_post_already_overdue_at_startup(db):
+    _scheduled_post(db, datetime.utcnow() - timedelta(hours=2))
+    _scheduled_post(db, datetime.utcnow() + timedelta(hours=1))
+
+    started = datetime.utcnow()
+    armed = _armed_for(db)
+
+    assert armed is not None and armed - started < timedelta(seconds=5)
+
+
+def test_next_due_tracker_runs_a_post_whose_lease_lapsed(db):
+    _scheduled_post(db, datetime.utcnow() - timedelta(minutes=30), lease_expires_at=datetime.utcnow() - timedelta(minutes=1))
+
+    started = datetime.utcnow()
+    armed = _armed_for(db)
+
+    assert armed is not None and armed - started < timedelta(seconds=5)
+
+
+def test_next_due_tracker_rechecks_a_held_lease_when_it_runs_out(db):
+    lease_ends = datetime.utcnow() + timedelta(minutes=3)
+    _scheduled_post(db, datetime.utcnow() - timedelta(minutes=1), lease_expires_at=lease_ends)
+
+    assert _armed_for(db) == lease_ends
+
+
+def test_a_worker_that_raises_is_logged_and_not_counted(db, monkeypatch, caplog):
+    _seed_scheduled_posts(db, count=2, media_per_post=0)
+
+    def _explode(session_factory, ctx, credentials, worker_id):
+        raise RuntimeError(f"worker crashed on {ctx.post.id}")
+
+    monkeypatch.setattr(scheduler, "_publish_prefetched", _explode)
+
+    with caplog.at_level("ERROR", logger="backend.scheduler"):
+        published = scheduler.process_scheduled_posts(SessionLocal, worker_id="worker")
+
+    assert published == 0
+    failures = [record for record in caplog.records if record.exc_info]
+    assert len(failures) == 2
+    assert all("worker crashed" in str(record.exc_info[1]) for record in failures)